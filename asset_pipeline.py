@@ -0,0 +1,115 @@
+import gzip
+import hashlib
+import logging
+import os
+from css_rewriter import dedupe_css, minify_css
+from process_pool import ProcessPool
+
+logger = logging.getLogger(__name__)
+
+COMPRESSED_SUFFIXES = {'gz': '.gz', 'br': '.br'}
+
+
+def minify_js(js):
+    """Minify JavaScript with rjsmin when it is installed, otherwise return it unchanged"""
+    try:
+        import rjsmin
+    except ImportError:
+        return js
+    return rjsmin.jsmin(js)
+
+
+def compress_file(job):
+    """Write precompressed siblings (styles.css.gz, styles.css.br) of a file
+
+    job is a (path, formats) pair. Returns the paths written. gzip output
+    has a zero mtime, so unchanged files compress to identical bytes.
+    """
+    path, formats = job
+    with open(path, 'rb') as f:
+        data = f.read()
+    written = []
+    for fmt in formats:
+        target = path + COMPRESSED_SUFFIXES[fmt]
+        if fmt == 'gz':
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            try:
+                import brotli
+            except ImportError:
+                continue
+            compressed = brotli.compress(data, quality=11)
+        tmp_path = f'{target}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, target)
+        written.append(target)
+    return written
+
+
+class AssetPipeline:
+    """Optional output stage that minifies, dedupes and precompresses bundles
+
+    Per-file work (minifying each input, compressing each output) is spread
+    over a process pool, created on first use and shared by every page of
+    a crawl.
+    """
+
+    def __init__(self, minify=True, compress=('gz', 'br'), workers=None):
+        self.minify = minify
+        self.compress_formats = tuple(fmt for fmt in compress or () if fmt in COMPRESSED_SUFFIXES)
+        self.pool = ProcessPool(workers)
+        self._warned = set()
+
+        if self.minify and not self._available('rjsmin'):
+            self._warn('rjsmin is not installed, JavaScript bundles will not be minified')
+        if 'br' in self.compress_formats and not self._available('brotli'):
+            self._warn('brotli is not installed, only .gz siblings will be written')
+
+    @staticmethod
+    def _available(module):
+        try:
+            __import__(module)
+        except ImportError:
+            return False
+        return True
+
+    def _warn(self, message):
+        if message not in self._warned:
+            self._warned.add(message)
+            logger.warning(message)
+
+    def build_css(self, contents):
+        """Join stylesheet texts into one bundle, minified and deduplicated"""
+        if self.minify:
+            contents = self.pool.map(minify_css, contents)
+            return dedupe_css(''.join(contents))
+        return dedupe_css('\n'.join(contents))
+
+    def build_js(self, paths):
+        """Join script files into one bundle, skipping byte-identical copies"""
+        parts = []
+        seen = set()
+        for path in paths:
+            with open(path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            if digest in seen:
+                logger.info(f'Skipping duplicate script {os.path.basename(path)}')
+                continue
+            seen.add(digest)
+            parts.append(data.decode('utf-8', errors='replace'))
+        if self.minify:
+            parts = self.pool.map(minify_js, parts)
+        # Each file ends its last statement, so a missing semicolon cannot join two files
+        return ';\n'.join(part.strip() for part in parts if part.strip())
+
+    def compress(self, paths):
+        """Write .gz/.br siblings for each path, in parallel across files"""
+        if not self.compress_formats:
+            return []
+        written = self.pool.map(compress_file, [(path, self.compress_formats) for path in paths])
+        return [target for targets in written for target in targets]
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+
+class AssetStore:
+    """Content-addressed asset store keyed by the SHA-256 of each body
+
+    Objects live under objects/<xx>/<digest>. A JSON-lines manifest maps
+    every fetched URL to its digest so later pages and later runs can reuse
+    stored bytes instead of downloading them again.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.partial_dir = os.path.join(root, 'partial')
+        self.index_file = os.path.join(root, 'index.jsonl')
+        self.index = {}
+        self.lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.partial_dir, exist_ok=True)
+        self.load_index()
+
+    def load_index(self):
+        """Load the URL->digest manifest; later lines win"""
+        if not os.path.exists(self.index_file):
+            return
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Truncated line from an interrupted run
+                self.index[record['url']] = record
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def lookup(self, url):
+        """Return the stored record for a URL, or None if its bytes are not stored"""
+        record = self.index.get(url)
+        if record and os.path.exists(self.object_path(record['digest'])):
+            return record
+        return None
+
+    def partial_path(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.partial_dir, f'{key}.part')
+
+    def claim_partial(self, url):
+        """Take over an interrupted download of url, returning (path, bytes held, validator)
+
+        The partial file is moved to a name of its own, so other downloads of
+        the same URL (crawl threads, batch processes) never write to it.
+        Returns (None, 0, None) if there is none or another download claimed
+        it first.
+        """
+        path = self.partial_path(url)
+        claimed = None
+        try:
+            with open(path + '.json', 'r', encoding='utf-8') as f:
+                validator = json.load(f)['validator']
+            fd, claimed = tempfile.mkstemp(dir=self.partial_dir, suffix='.part')
+            os.close(fd)
+            os.replace(path, claimed)
+            return claimed, os.path.getsize(claimed), validator
+        except (OSError, ValueError, KeyError):
+            if claimed:
+                self.drop_partial(claimed)
+            return None, 0, None
+
+    def keep_partial(self, url, path, validator):
+        """Make the bytes at path the resumable partial download of url, or drop them if that fails"""
+        partial = self.partial_path(url)
+        try:
+            fd, meta_path = tempfile.mkstemp(dir=self.partial_dir, suffix='.json')
+            with os.fdopen(fd, 'w', encoding='utf-8') as meta:
+                json.dump({'url': url, 'validator': validator}, meta)
+            os.replace(meta_path, partial + '.json')
+            os.replace(path, partial)
+        except OSError:
+            self.drop_partial(path)
+
+    def drop_partial(self, path):
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def discard_partial(self, url):
+        path = self.partial_path(url)
+        for leftover in (path, path + '.json'):
+            self.drop_partial(leftover)
+
+    def put_stream(self, url, chunks, content_type='', validator=None, partial=None):
+        """Store a body from an iterable of byte chunks and index it under url
+
+        Chunks are hashed and written to a temporary file of this call's own
+        as they arrive, which is renamed into place only once the body is
+        complete. Pass url=None to store derived content (e.g. rewritten
+        CSS) without adding it to the URL index.
+
+        With a validator (the response's ETag or Last-Modified) a failed
+        download is kept as url's partial file so it can resume. partial is
+        a file returned by claim_partial; the chunks are appended to it.
+        """
+        sha256 = hashlib.sha256()
+        size = 0
+        if partial:
+            tmp_path = partial
+            with open(tmp_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha256.update(chunk)
+                    size += len(chunk)
+            f = open(tmp_path, 'ab')
+        else:
+            fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir, suffix='.part')
+            f = os.fdopen(fd, 'wb')
+        try:
+            with f:
+                for chunk in chunks:
+                    if chunk:
+                        sha256.update(chunk)
+                        size += len(chunk)
+                        f.write(chunk)
+
+            digest = sha256.hexdigest()
+            path = self.object_path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path):
+                os.remove(tmp_path)  # Same bytes already stored
+            else:
+                os.replace(tmp_path, path)
+            if validator:
+                self.discard_partial(url)
+        except BaseException:
+            if validator and os.path.exists(tmp_path):
+                self.keep_partial(url, tmp_path, validator)
+            else:
+                self.drop_partial(tmp_path)
+            raise
+
+        if url is None:
+            return {'digest': digest, 'size': size, 'content_type': content_type}
+        return self.record(url, digest, size, content_type)
+
+    def put_bytes(self, url, data, content_type=''):
+        return self.put_stream(url, [data], content_type)
+
+    def record(self, url, digest, size, content_type):
+        """Index url under digest, appending to the manifest if it changed"""
+        record = {
+            'url': url,
+            'digest': digest,
+            'size': size,
+            'content_type': content_type
+        }
+        with self.lock:
+            if self.index.get(url) != record:
+                self.index[url] = record
+                with open(self.index_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return record
+
+    def read(self, digest):
+        with open(self.object_path(digest), 'rb') as f:
+            return f.read()
+
+    def iter_chunks(self, digest, chunk_size=65536):
+        with open(self.object_path(digest), 'rb') as f:
+            yield from iter(lambda: f.read(chunk_size), b'')
+
+    def materialize(self, digest, directory, filename):
+        """Link a stored object into directory and return the filename used
+
+        If filename is already taken by different content, the digest is
+        appended to the name instead of overwriting the other file.
+        """
+        source = self.object_path(digest)
+        with self.lock:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, filename)
+            if os.path.exists(path) and not os.path.samefile(path, source):
+                name, ext = os.path.splitext(filename)
+                filename = f'{name}-{digest[:8]}{ext}'
+                path = os.path.join(directory, filename)
+
+            if not os.path.exists(path):
+                try:
+                    os.link(source, path)
+                except OSError:
+                    shutil.copyfile(source, path)  # Cross-device or no hard-link support
+        return filename
@@ -0,0 +1,211 @@
+"""Clone a list of websites in parallel across a pool of processes
+
+    python batch.py urls.txt --processes 8 --connections 64 --rate 50
+    cat urls.txt | python batch.py - --crawl --max-pages 20
+"""
+from scraper import WebScraper
+from crawler import Crawler
+from downloader import GlobalLimits
+from driver_pool import close_default_pool
+from fetch_strategy import RENDER_MODES
+from multiprocessing.util import Finalize
+import argparse
+import config
+import json
+import multiprocessing
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+_limits = None
+
+
+def parse_args():
+    settings = config.DEFAULT_CONFIG
+    parser = argparse.ArgumentParser(description='Clone many websites in parallel')
+    parser.add_argument('urls', help='File with one URL per line, or - to read from stdin')
+    parser.add_argument('--processes', type=int, default=settings['BATCH_PROCESSES'], help='Sites cloned in parallel')
+    parser.add_argument('--connections', type=int, default=settings['BATCH_CONNECTIONS'],
+                        help='Requests in flight across all processes')
+    parser.add_argument('--rate', type=float, default=settings['BATCH_REQUESTS_PER_SECOND'],
+                        help='Requests per second across all processes (0 disables)')
+    parser.add_argument('--crawl', action='store_true', help='Crawl each site instead of cloning its start page')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue interrupted crawls from their journals (implies --crawl)')
+    parser.add_argument('--max-depth', type=int, default=settings['CRAWL_MAX_DEPTH'], help='Maximum link depth when crawling')
+    parser.add_argument('--max-pages', type=int, default=settings['CRAWL_MAX_PAGES'], help='Maximum pages per site when crawling')
+    parser.add_argument('--workers', type=int, default=settings['CRAWL_WORKERS'], help='Pages processed concurrently per site')
+    parser.add_argument('--render', choices=RENDER_MODES, default=settings['RENDER_MODE'],
+                        help='auto: use Chrome only for pages that need JavaScript; static: never; browser: always')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Minify and dedupe the combined CSS/JS and write .gz/.br siblings')
+    parser.add_argument('--optimize-images', action='store_true',
+                        help='Re-encode images, add WebP and srcset variants (needs Pillow)')
+    parser.add_argument('--capture', action='store_true',
+                        help="Reuse the responses Chrome downloads while rendering instead of fetching assets again")
+    parser.add_argument('--report', default=os.path.join('data', 'batch_report.jsonl'),
+                        help='Per-site results, one JSON object per line')
+    return parser.parse_args()
+
+
+def read_urls(source):
+    """Read URLs one per line, skipping blanks, # comments and duplicates"""
+    lines = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    urls = []
+    with lines:
+        for line in lines:
+            url = line.strip()
+            if not url or url.startswith('#'):
+                continue
+            if '://' not in url:
+                url = f'https://{url}'
+            urls.append(url)
+    return list(dict.fromkeys(urls))
+
+
+def group_sites(urls):
+    """Group URLs by host, in input order
+
+    Each site is cloned into data/<domain>/, so all URLs of one host must
+    go to the same job; two processes cloning the same host would
+    overwrite each other's records, metadata, HTTP cache and journal.
+    """
+    sites = {}
+    for url in urls:
+        sites.setdefault(urlparse(url).netloc.lower(), []).append(url)
+    return list(sites.values())
+
+
+def init_worker(limits, overrides=None):
+    """Pool initializer: share the global limits and settings, and close Chrome when the worker exits"""
+    global _limits
+    _limits = limits
+    config.DEFAULT_CONFIG.update(overrides or {})
+    Finalize(None, close_default_pool, exitpriority=10)
+
+
+def clone_site(job):
+    """Clone (or crawl) one site's URLs in a worker process and return its result record"""
+    urls, options = job
+    url = urls[0]
+    start = time.monotonic()
+    result = {'url': url, 'status': 'failed'}
+    if len(urls) > 1:
+        result['urls'] = urls
+    scraper = None
+    try:
+        scraper = WebScraper(url, render_mode=options['render'], global_limits=_limits,
+                             optimize_assets=options['optimize'] or None,
+                             optimize_images=options['optimize_images'] or None)
+        result['output_dir'] = scraper.base_dir
+        
+        if options['crawl'] or options['resume']:
+            crawler = Crawler(scraper, max_depth=options['max_depth'], max_pages=options['max_pages'],
+                              workers=options['workers'], resume=options['resume'], start_urls=urls)
+            crawl = crawler.crawl()
+            result['pages'] = len(crawl['pages'])
+            result['failed_pages'] = len(crawl['failed'])
+            if crawl['pages']:
+                result['status'] = 'ok'
+        else:
+            pages = [data for data in (scraper.clone_website(page) for page in urls) if data]
+            if pages:
+                result['status'] = 'ok'
+                result['pages'] = len(pages)
+                result['images'] = sum(len(data['images']) for data in pages)
+            if len(pages) < len(urls):
+                result['failed_pages'] = len(urls) - len(pages)
+        if result['status'] != 'ok':
+            result['error'] = 'Clone failed, see scraping.log'
+        
+        stats = scraper.metrics.to_dict()
+        result['requests'] = sum(host['count'] for host in stats['hosts'].values())
+        result['bytes'] = sum(asset['bytes'] for asset in stats['assets'].values())
+        
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {str(e)}'
+    finally:
+        if scraper:
+            scraper.close()
+    result['seconds'] = round(time.monotonic() - start, 3)
+    return result
+
+
+def summarize(results, elapsed):
+    """Totals over every site in the batch"""
+    ok = [result for result in results if result['status'] == 'ok']
+    return {
+        'sites': len(results),
+        'succeeded': len(ok),
+        'failed': len(results) - len(ok),
+        'pages': sum(result.get('pages', 0) for result in results),
+        'requests': sum(result.get('requests', 0) for result in results),
+        'bytes': sum(result.get('bytes', 0) for result in results),
+        'elapsed': round(elapsed, 3),
+        'slowest': [
+            {'url': result['url'], 'seconds': result['seconds']}
+            for result in sorted(results, key=lambda result: result['seconds'], reverse=True)[:5]
+        ]
+    }
+
+
+def main():
+    args = parse_args()
+    urls = read_urls(args.urls)
+    if not urls:
+        print('No URLs to clone')
+        return
+    sites = group_sites(urls)
+    
+    options = {
+        'render': args.render,
+        'crawl': args.crawl,
+        'resume': args.resume,
+        'max_depth': args.max_depth,
+        'max_pages': args.max_pages,
+        'workers': args.workers,
+        'optimize': args.optimize,
+        'optimize_images': args.optimize_images
+    }
+    limits = GlobalLimits(args.connections, args.rate)
+    processes = max(1, min(args.processes, len(sites)))
+    os.makedirs(os.path.dirname(args.report) or '.', exist_ok=True)
+    
+    print(f'Cloning {len(sites)} sites ({len(urls)} URLs) with {processes} processes...')
+    start = time.monotonic()
+    results = []
+    with open(args.report, 'w', encoding='utf-8') as report, multiprocessing.Pool(
+            processes,
+            initializer=init_worker,
+            initargs=(limits, {'BROWSER_CAPTURE': True} if args.capture else None),
+            maxtasksperchild=config.DEFAULT_CONFIG['BATCH_SITES_PER_PROCESS']) as pool:
+        for result in pool.imap_unordered(clone_site, [(site, options) for site in sites]):
+            results.append(result)
+            report.write(json.dumps(result, ensure_ascii=False) + '\n')
+            report.flush()
+            print(f'[{len(results)}/{len(sites)}] {result["status"]:<6} {result["url"]} ({result["seconds"]}s)'
+                  + (f' - {result["error"]}' if 'error' in result else ''))
+    
+    summary = summarize(results, time.monotonic() - start)
+    summary_file = os.path.splitext(args.report)[0] + '_summary.json'
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    
+    print(f'''
+Batch finished in {summary["elapsed"]}s:
+- Sites cloned: {summary["succeeded"]}
+- Sites failed: {summary["failed"]}
+- Pages: {summary["pages"]}
+- Requests: {summary["requests"]}
+- Downloaded: {summary["bytes"] / 1024 / 1024:.1f} MB
+
+Report saved in: {args.report}
+Summary saved in: {summary_file}
+''')
+    if summary['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Compare WebDriver round trips for image discovery
+
+Renders a generated image-heavy page in headless Chrome and runs both the
+old per-element get_attribute discovery and the single injected script
+used by WebScraper.get_image_urls.
+
+    python -m benchmarks.bench_image_discovery --images 500
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+from selenium.webdriver.common.by import By
+from driver_pool import create_driver
+from scraper import IMAGE_DISCOVERY_SCRIPT
+
+
+def build_page(count):
+    """Generate a page with count images spread over every discovery path"""
+    parts = ['<html><body>']
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            parts.append(f'<img src="img/{i}.png">')
+        elif kind == 1:
+            parts.append(f'<img src="img/{i}.png" srcset="img/{i}-1x.png 1x, img/{i}-2x.png 2x">')
+        elif kind == 2:
+            parts.append(f'<img data-src="img/{i}.jpg" data-original="img/{i}-orig.jpg">')
+        elif kind == 3:
+            parts.append(f'<div style="background-image: url(\'img/{i}-bg.jpg\')"></div>')
+        else:
+            parts.append(f'<picture><source srcset="img/{i}.webp 1x, img/{i}-2x.webp 2x"><img src="img/{i}.png"></picture>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def legacy_image_urls(driver):
+    """The previous discovery: find_elements per selector, get_attribute per element"""
+    image_urls = set()
+    selectors = [
+        'img[src]', 'img[data-src]', 'img[data-original]',
+        'div[style*="background-image"]', 'div[data-bg]',
+        'picture source[srcset]'
+    ]
+    for selector in selectors:
+        for element in driver.find_elements(By.CSS_SELECTOR, selector):
+            for attr in ['src', 'data-src', 'data-original', 'srcset', 'data-bg']:
+                value = element.get_attribute(attr)
+                if value:
+                    if ',' in value:
+                        for url in value.split(','):
+                            image_urls.add(url.strip().split(' ')[0])
+                    else:
+                        image_urls.add(value)
+            style = element.get_attribute('style')
+            if style and 'background-image' in style:
+                image_urls.update(re.findall(r'url\(["\']?(.*?)["\']?\)', style))
+
+    js_images = driver.execute_script("""
+        var images = [];
+        var elements = document.getElementsByTagName('*');
+        for (var i = 0; i < elements.length; i++) {
+            var bg = window.getComputedStyle(elements[i], null).backgroundImage;
+            if (bg && bg !== 'none') images.push(bg);
+        }
+        return images;
+    """)
+    for img in js_images:
+        image_urls.update(re.findall(r'url\(["\']?(.*?)["\']?\)', img))
+    return image_urls
+
+
+def batched_image_urls(driver):
+    return set(driver.execute_script(IMAGE_DISCOVERY_SCRIPT))
+
+
+def count_round_trips(driver):
+    """Wrap driver.execute so every WebDriver command is counted"""
+    counter = {'calls': 0}
+    execute = driver.execute
+
+    def counting_execute(command, params=None):
+        counter['calls'] += 1
+        return execute(command, params)
+
+    driver.execute = counting_execute
+    return counter
+
+
+def run(driver, method):
+    counter = count_round_trips(driver)
+    start = time.perf_counter()
+    urls = method(driver)
+    elapsed = time.perf_counter() - start
+    del driver.execute  # Restore the class method
+    return urls, counter['calls'], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=500, help='Images on the generated page')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        page = os.path.join(tmp, 'index.html')
+        with open(page, 'w', encoding='utf-8') as f:
+            f.write(build_page(args.images))
+
+        driver = create_driver()
+        try:
+            driver.get(f'file://{page}')
+            legacy_urls, legacy_calls, legacy_time = run(driver, legacy_image_urls)
+            batched_urls, batched_calls, batched_time = run(driver, batched_image_urls)
+        finally:
+            driver.quit()
+
+    print(f'Images on page: {args.images}')
+    print(f'legacy  : {legacy_calls:6d} round trips  {legacy_time:8.3f}s  {len(legacy_urls)} urls')
+    print(f'batched : {batched_calls:6d} round trips  {batched_time:8.3f}s  {len(batched_urls)} urls')
+    print(f'Same result: {legacy_urls == batched_urls}')
+
+
+if __name__ == '__main__':
+    main()
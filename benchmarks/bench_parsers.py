@@ -0,0 +1,60 @@
+"""Benchmark each installed HTML parser backend on a large synthetic document
+
+Times parsing, text extraction on the parsed tree, and writing the page
+out both the previous way (prettify) and with the streaming serializer.
+Backends that are not installed are skipped.
+
+    python -m benchmarks.bench_parsers --nodes 50000 --repeat 3
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from html_document import PARSER_BACKENDS, parse_html, parser_available, write_html
+from text_extraction import extract_text
+from benchmarks.bench_text_extraction import build_document
+
+
+def timed(func, repeat):
+    """Run func repeat times and return (median seconds, last result)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def write_prettified(soup, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(str(soup.prettify()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=50000, help='Approximate element count')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement; the median is reported')
+    args = parser.parse_args()
+
+    html = build_document(args.nodes)
+    print(f'Document: {len(html) / 1024:.0f} KiB')
+    print(f'{"backend":<13}{"parse":>9}{"extract":>9}{"prettify":>10}{"stream":>9}{"elements":>10}')
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = os.path.join(out_dir, 'index.html')
+        for backend in PARSER_BACKENDS:
+            if not parser_available(backend):
+                print(f'{backend:<13}not installed')
+                continue
+            parse_time, soup = timed(lambda: parse_html(html, backend), args.repeat)
+            # extract_text only reads the tree, so one parse serves every run
+            extract_time, _ = timed(lambda: extract_text(soup), args.repeat)
+            pretty_time, _ = timed(lambda: write_prettified(soup, path), args.repeat)
+            stream_time, _ = timed(lambda: write_html(soup, path), args.repeat)
+            print(f'{backend:<13}{parse_time:>8.3f}s{extract_time:>8.3f}s{pretty_time:>9.3f}s'
+                  f'{stream_time:>8.3f}s{len(soup.find_all(True)):>10}')
+
+
+if __name__ == '__main__':
+    main()
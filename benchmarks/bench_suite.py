@@ -0,0 +1,198 @@
+"""Offline benchmark suite over a generated fixture site
+
+Generates a fixture site, serves it from a local HTTP server and times the
+scraper's hot paths against it. Each case runs in a fresh process with its
+own working directory and asset store, so peak RSS and caches are not
+shared between cases.
+
+    python -m benchmarks.bench_suite --pages 20 --images 50 --css-kb 200 --import-depth 3 --latency 0.02
+    python -m benchmarks.bench_suite --save-baseline baseline.json
+    python -m benchmarks.bench_suite --baseline baseline.json --threshold 0.1
+    python -m benchmarks.bench_suite --parser html.parser
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from bs4 import BeautifulSoup
+import config
+from crawler import Crawler
+from scraper import WebScraper
+from benchmarks.fixture_site import FixtureServer, build_site
+
+CASES = ('clone_cold', 'clone_warm', 'crawl', 'extract_text_content', 'update_css_paths', 'get_image_urls')
+
+
+def clone_cold(url, site_dir):
+    scraper = WebScraper(url, render_mode='static')
+    start = time.perf_counter()
+    scraper.clone_website()
+    return time.perf_counter() - start, scraper
+
+
+def clone_warm(url, site_dir):
+    WebScraper(url, render_mode='static').clone_website()
+    scraper = WebScraper(url, render_mode='static')
+    start = time.perf_counter()
+    scraper.clone_website()
+    return time.perf_counter() - start, scraper
+
+
+def crawl(url, site_dir):
+    scraper = WebScraper(url, render_mode='static')
+    crawler = Crawler(scraper, max_depth=1, max_pages=10 ** 6)
+    start = time.perf_counter()
+    crawler.crawl()
+    return time.perf_counter() - start, scraper
+
+
+def extract_text_content(url, site_dir):
+    scraper = WebScraper(url, render_mode='static')
+    with open(os.path.join(site_dir, 'index.html'), encoding='utf-8') as f:
+        soup = BeautifulSoup(f.read(), 'html.parser')
+    start = time.perf_counter()
+    scraper.extract_text_content(soup)
+    return time.perf_counter() - start, scraper
+
+
+def update_css_paths(url, site_dir):
+    scraper = WebScraper(url, render_mode='static')
+    with open(os.path.join(site_dir, 'css', 'main.css'), encoding='utf-8') as f:
+        css_content = f.read()
+    start = time.perf_counter()
+    scraper.update_css_paths(css_content, f'{url}css/main.css')
+    return time.perf_counter() - start, scraper
+
+
+def get_image_urls(url, site_dir):
+    scraper = WebScraper(url, render_mode='browser')
+    with scraper.borrow_driver():
+        scraper.driver.get(url)
+        soup = BeautifulSoup(scraper.driver.page_source, 'html.parser')
+        start = time.perf_counter()
+        scraper.get_image_urls(soup)
+        return time.perf_counter() - start, scraper
+
+
+def run_case(case, url, site_dir, work_dir, overrides, results):
+    """Child process entry point: run one case in work_dir and report its measurements
+
+    Requests and bytes come from the timed scraper's own metrics, so
+    warm-up work done by a case is not counted.
+    """
+    logging.basicConfig(level=logging.WARNING)
+    config.DEFAULT_CONFIG.update(overrides)
+    os.chdir(work_dir)
+    try:
+        seconds, scraper = globals()[case](url, site_dir)
+        stats = scraper.metrics.to_dict()
+        results.put({
+            'seconds': seconds,
+            'requests': sum(host['count'] for host in stats['hosts'].values()),
+            'bytes': sum(asset['bytes'] for asset in stats['assets'].values()),
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        })
+    except Exception as e:
+        results.put({'error': f'{type(e).__name__}: {e}'})
+
+
+def measure(case, server, site_dir, overrides, context):
+    """Run a case in a fresh process, returning its timing, traffic and peak RSS"""
+    results = context.Queue()
+    with tempfile.TemporaryDirectory() as work_dir:
+        process = context.Process(target=run_case, args=(case, server.url, site_dir, work_dir, overrides, results))
+        process.start()
+        result = results.get()
+        process.join()
+    return result
+
+
+def summarize(runs):
+    """Median time over the repeats; traffic and RSS from the worst run"""
+    return {
+        'seconds': round(statistics.median(run['seconds'] for run in runs), 4),
+        'requests': max(run['requests'] for run in runs),
+        'bytes': max(run['bytes'] for run in runs),
+        'peak_rss_mb': round(max(run['peak_rss_mb'] for run in runs), 1)
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print changes against a baseline and return the cases that slowed down past threshold"""
+    regressions = []
+    print(f'\n{"case":<22}{"baseline":>10}{"current":>10}{"change":>9}')
+    for case, result in results.items():
+        previous = baseline.get('results', {}).get(case)
+        if not previous:
+            continue
+        change = (result['seconds'] - previous['seconds']) / previous['seconds'] if previous['seconds'] else 0
+        flag = '  REGRESSION' if change > threshold else ''
+        print(f'{case:<22}{previous["seconds"]:>9.3f}s{result["seconds"]:>9.3f}s{change:>+8.1%}{flag}')
+        if flag:
+            regressions.append(case)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=10, help='Pages in the fixture site')
+    parser.add_argument('--images', type=int, default=30, help='Distinct images in the fixture site')
+    parser.add_argument('--css-kb', type=int, default=100, help='Total stylesheet size in KiB')
+    parser.add_argument('--import-depth', type=int, default=2, help='Levels of @import below main.css')
+    parser.add_argument('--paragraphs', type=int, default=30, help='Paragraphs per page')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of latency added to every response')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='REQUESTS_PER_SECOND for the scraper (default 0: no politeness limit)')
+    parser.add_argument('--parser', default='auto', help='HTML_PARSER backend for the scraper (auto/lxml/html.parser)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case; the median time is reported')
+    parser.add_argument('--cases', nargs='+', choices=CASES, help='Cases to run (default: all but get_image_urls)')
+    parser.add_argument('--browser', action='store_true', help='Include get_image_urls (needs Chrome)')
+    parser.add_argument('--baseline', help='Compare against results saved with --save-baseline')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Slowdown that counts as a regression')
+    parser.add_argument('--save-baseline', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    cases = args.cases or [case for case in CASES if args.browser or case != 'get_image_urls']
+    params = {key: getattr(args, key)
+              for key in ('pages', 'images', 'css_kb', 'import_depth', 'paragraphs', 'latency', 'rate', 'parser')}
+    overrides = {'REQUESTS_PER_SECOND': args.rate, 'HTML_PARSER': args.parser}
+    context = multiprocessing.get_context('spawn')
+
+    results = {}
+    with tempfile.TemporaryDirectory() as site_dir:
+        build_site(site_dir, args.pages, args.images, args.css_kb, args.import_depth, args.paragraphs)
+        with FixtureServer(site_dir, args.latency) as server:
+            print(f'Fixture site: {params}')
+            print(f'{"case":<22}{"time":>10}{"requests":>10}{"bytes":>12}{"peak RSS":>11}')
+            for case in cases:
+                runs = [measure(case, server, site_dir, overrides, context) for _ in range(args.repeat)]
+                errors = [run['error'] for run in runs if 'error' in run]
+                if errors:
+                    print(f'{case:<22}failed: {errors[0]}')
+                    continue
+                result = results[case] = summarize(runs)
+                print(f'{case:<22}{result["seconds"]:>9.3f}s{result["requests"]:>10}'
+                      f'{result["bytes"]:>12}{result["peak_rss_mb"]:>8.1f} MB')
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'params': params, 'results': results}, f, indent=2)
+        print(f'\nBaseline saved to {args.save_baseline}')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('params') != params:
+            print(f'\nWarning: baseline was recorded with different fixtures: {baseline.get("params")}')
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
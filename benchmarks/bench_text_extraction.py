@@ -0,0 +1,103 @@
+"""Benchmark paragraph extraction on a large synthetic document
+
+Compares the previous selector-by-selector extraction with the single
+tree walk used by WebScraper.extract_text_content.
+
+    python -m benchmarks.bench_text_extraction --nodes 50000
+"""
+import argparse
+import random
+import time
+from bs4 import BeautifulSoup
+from text_extraction import extract_text
+
+WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod '
+         'tempor incididunt ut labore et dolore magna aliqua').split()
+CLASSES = ['', 'content', 'text', 'post-content', 'card-body', 'rich-text', 'wrapper']
+
+
+def build_document(nodes, seed=0):
+    """Generate nested content containers until roughly `nodes` elements exist"""
+    rng = random.Random(seed)
+    parts = ['<html><body><nav><ul>']
+    parts.extend(f'<li><a href="/page/{i}">Page {i}</a></li>' for i in range(20))
+    parts.append('</ul></nav><main>')
+    count = 0
+    while count < nodes:
+        parts.append('<section><h2>Section heading</h2>')
+        count += 2
+        for _ in range(rng.randint(2, 6)):
+            cls = rng.choice(CLASSES)
+            parts.append(f'<div class="{cls}">' if cls else '<div>')
+            parts.append(f'<article><h3>{" ".join(rng.sample(WORDS, 3))}</h3>')
+            count += 3
+            for _ in range(rng.randint(3, 10)):
+                sentence = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 25)))
+                parts.append(f'<p>{sentence} <a href="/doc/{rng.randint(0, 500)}">link</a> <span>more</span></p>')
+                count += 3
+            if rng.random() < 0.2:
+                parts.append('<script>var tracked = true;</script>')
+                count += 1
+            parts.append('</article></div>')
+        parts.append('</section>')
+    parts.append('</main></body></html>')
+    return ''.join(parts)
+
+
+def legacy_extract(soup):
+    """The previous extraction: one pass per selector, list membership checks"""
+    headers = []
+    for h in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+        for element in h.find_all(['script', 'style']):
+            element.decompose()
+        text = h.get_text(strip=True, separator=' ')
+        if text and not text.isspace():
+            headers.append(text)
+
+    paragraphs = []
+    content_selectors = [
+        'p', 'article', 'section', '.content', '.text',
+        '[class*="content"]', '[class*="text"]', '[class*="body"]',
+        'div > p', 'main p', 'article p'
+    ]
+    for selector in content_selectors:
+        for element in soup.select(selector):
+            if any(p in paragraphs for p in element.parents):
+                continue
+            for unwanted in element.find_all(['script', 'style', 'nav']):
+                unwanted.decompose()
+            text = element.get_text(strip=True, separator=' ')
+            if text and not text.isspace() and len(text) > 20:
+                if text not in paragraphs:
+                    paragraphs.append(text)
+    return headers, paragraphs
+
+
+def timed(func, html):
+    soup = BeautifulSoup(html, 'html.parser')
+    start = time.perf_counter()
+    result = func(soup)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=50000, help='Approximate element count')
+    parser.add_argument('--skip-legacy', action='store_true', help='Only time the single tree walk')
+    args = parser.parse_args()
+
+    html = build_document(args.nodes)
+    soup = BeautifulSoup(html, 'html.parser')
+    print(f'Document: {len(soup.find_all(True))} elements, {len(html) / 1024:.0f} KiB')
+
+    (headers, paragraphs, _), walk_time = timed(extract_text, html)
+    print(f'single walk : {walk_time:8.3f}s  {len(headers)} headers, {len(paragraphs)} paragraphs')
+
+    if not args.skip_legacy:
+        (legacy_headers, legacy_paragraphs), legacy_time = timed(legacy_extract, html)
+        print(f'legacy      : {legacy_time:8.3f}s  {len(legacy_headers)} headers, {len(legacy_paragraphs)} paragraphs')
+        print(f'Speedup: {legacy_time / walk_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
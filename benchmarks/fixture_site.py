@@ -0,0 +1,105 @@
+"""Generated fixture sites and a local server for offline benchmarks"""
+import functools
+import os
+import random
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod '
+         'tempor incididunt ut labore et dolore magna aliqua').split()
+
+
+def sentence(rng, low=8, high=30):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def build_site(root, pages=10, images=20, css_kb=50, import_depth=2, paragraphs=30, seed=0):
+    """Write a static site into root and return the path of its start page
+
+    Every page links to every other page, shows a share of the images and
+    uses main.css, which pulls in a chain of import_depth @import levels.
+    The stylesheets together hold about css_kb KiB of rules, each with a
+    background image.
+    """
+    rng = random.Random(seed)
+    for directory in ('img', 'css', 'js'):
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+    for i in range(images):
+        # Content is never decoded, only the size and extension matter
+        with open(os.path.join(root, 'img', f'{i}.png'), 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n' + rng.randbytes(rng.randint(2, 50) * 1024))
+
+    sheets = ['main.css'] + [f'level{level}.css' for level in range(1, import_depth + 1)]
+    per_sheet = css_kb * 1024 // len(sheets)
+    for index, name in enumerate(sheets):
+        rules = []
+        if index + 1 < len(sheets):
+            rules.append(f'@import url("{sheets[index + 1]}");')
+        size = 0
+        rule = 0
+        while size < per_sheet:
+            image = rng.randrange(images) if images else None
+            background = f' background: url(../img/{image}.png) no-repeat;' if image is not None else ''
+            text = f'.{name[:-4]}-rule-{rule} {{ margin: {rule % 16}px;{background} /* {sentence(rng, 2, 6)} */ }}'
+            rules.append(text)
+            size += len(text) + 1
+            rule += 1
+        with open(os.path.join(root, 'css', name), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(rules))
+
+    with open(os.path.join(root, 'js', 'app.js'), 'w', encoding='utf-8') as f:
+        f.write('var pages = %d;\n' % pages)
+
+    names = ['index.html'] + [f'page-{i}.html' for i in range(1, pages)]
+    for name in names:
+        parts = ['<html><head><title>Fixture</title><link rel="stylesheet" href="css/main.css">'
+                 '<script src="js/app.js"></script></head><body><nav><ul>']
+        parts.extend(f'<li><a href="{other}">{other}</a></li>' for other in names)
+        parts.append('</ul></nav><main>')
+        for p in range(paragraphs):
+            if p % 10 == 0:
+                parts.append(f'<h2>{sentence(rng, 2, 5)}</h2>')
+            parts.append(f'<p>{sentence(rng)}</p>')
+            if images and p % 3 == 0:
+                parts.append(f'<img src="img/{rng.randrange(images)}.png" alt="">')
+        parts.append('</main></body></html>')
+        with open(os.path.join(root, name), 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
+    return names[0]
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Serves the fixture directory, adding latency to every response"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        super().do_GET()
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Local HTTP server for a fixture site, run on a background thread"""
+
+    daemon_threads = True
+
+    def __init__(self, root, latency=0.0):
+        super().__init__(('127.0.0.1', 0), functools.partial(FixtureHandler, directory=root))
+        self.latency = latency
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
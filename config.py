@@ -1,11 +1,59 @@
 DEFAULT_CONFIG = {
     'BASE_URL': 'https://pcb-factory-wwcjm2h.gamma.site/',
     'DOWNLOAD_PATH': 'images',
-    'REQUEST_DELAY': 1.5,
-    'MAX_RETRIES': 3,
+    'REQUEST_DELAY': 1.5,  # Retry backoff factor: retries after 0s, 3s, 6s...
+    'MAX_RETRIES': 3,  # Retries for connection errors, 429 and 5xx responses
     'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-    'OUTPUT_FORMAT': 'csv',  # csv/json
+    'OUTPUT_FORMAT': 'csv',  # Extracted records: csv / jsonl (or json) / parquet (needs pyarrow)
     'ARABIC_SUPPORT': True,
-    'ENCODING': 'utf-8-sig',
-    'ALLOWED_CHARS': 'أبتثجحخدذرزسشصضطظعغفقكلمنهويىئةءؤإآ'
+    'ENCODING': 'utf-8-sig',  # CSV record files (the BOM lets Excel read Arabic text)
+    'ALLOWED_CHARS': 'أبتثجحخدذرزسشصضطظعغفقكلمنهويىئةءؤإآ',
+    'DOWNLOAD_WORKERS': 8,  # Concurrent asset downloads
+    'MAX_CONNECTIONS_PER_HOST': 4,
+    'REQUESTS_PER_SECOND': 8,  # Per-host politeness limit (0 disables)
+    'REQUEST_BURST': 8,
+    'CRAWL_MAX_DEPTH': 2,  # Link hops from the start page
+    'CRAWL_MAX_PAGES': 100,
+    'CRAWL_WORKERS': 4,  # Pages processed concurrently
+    'CRAWL_CHECKPOINT_INTERVAL': 5,  # Seconds between fsync'd crawl journal checkpoints
+    'ASSET_STORE_DIR': 'data/.store',  # Content-addressed asset store shared across runs
+    'RENDER_MODE': 'auto',  # auto (browser only when needed) / static / browser
+    'HTML_PARSER': 'auto',  # auto (lxml when installed) / lxml / html.parser
+    'DRIVER_POOL_SIZE': 2,  # Warm Chrome instances shared across scrapes
+    'DRIVER_MAX_PAGES': 50,  # Recycle a Chrome instance after this many pages
+    'DRIVER_CACHE_FILE': 'data/.driver.json',  # Resolved chromedriver/Chrome locations, reused offline
+    'CHROMEDRIVER_PATH': None,  # Use this chromedriver instead of resolving one
+    'CHROME_BINARY': None,  # Chrome executable (None: first of google-chrome/chromium on PATH)
+    'BROWSER_CAPTURE': False,  # Keep the bodies Chrome downloads while rendering instead of fetching them again
+    'BROWSER_BLOCK': ('media',),  # Resource types not loaded while capturing: media / font / image
+    'BROWSER_BLOCK_HOSTS': (  # Hosts not loaded while capturing (analytics and ad trackers)
+        'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'connect.facebook.net', 'hotjar.com'
+    ),
+    'PAGE_QUIET_WINDOW': 0.5,  # Seconds without DOM or network activity before a page counts as loaded
+    'PAGE_STABLE_TIMEOUT': 10,  # Hard cap on waiting for a page to settle
+    'SCROLL_QUIET_WINDOW': 0.3,  # Quiet period after each scroll step
+    'SCROLL_TIMEOUT': 30,
+    'SCROLL_MAX_STEPS': 50,
+    'MAX_ASSET_BYTES': 100 * 1024 * 1024,  # Largest single asset to download (0 disables)
+    'MAX_RUN_BYTES': 2 * 1024 * 1024 * 1024,  # Total bytes downloaded per scraper run (0 disables)
+    'DOWNLOAD_CHUNK_SIZE': 64 * 1024,  # Bytes held in memory per download at a time
+    'RESUME_DOWNLOADS': True,  # Continue interrupted downloads with HTTP Range requests
+    'TRANSPORT': 'requests',  # requests / http2 (needs httpx[http2], falls back to requests)
+    'CONNECT_TIMEOUT': 5,  # Default seconds to establish a connection
+    'READ_TIMEOUT': 30,  # Default seconds to wait for data from the server
+    'ASSET_PIPELINE': False,  # Minify, dedupe and precompress each page's combined stylesheet and script
+    'ASSET_MINIFY': True,  # Strip comments and whitespace (JavaScript needs rjsmin)
+    'ASSET_COMPRESS': ('gz', 'br'),  # Precompressed siblings to write (.br needs brotli)
+    'ASSET_PIPELINE_WORKERS': None,  # Processes for the pipeline (None: one per CPU)
+    'IMAGE_OPTIMIZE': False,  # Re-encode downloaded images and add srcset variants (needs Pillow)
+    'IMAGE_QUALITY': 82,  # JPEG/WebP/AVIF quality (None: lossless recompression only)
+    'IMAGE_FORMATS': ('webp',),  # Extra formats to generate: webp / avif
+    'IMAGE_SRCSET_WIDTHS': (480, 960, 1440),  # Widths of the smaller srcset copies
+    'IMAGE_STRIP_METADATA': True,  # Drop EXIF data (after applying its orientation)
+    'IMAGE_WORKERS': None,  # Encoding processes (None: one per CPU)
+    'METRICS_EXPORT': None,  # Also write stats.prom in Prometheus text format when 'prometheus'
+    'BATCH_PROCESSES': 4,  # Sites cloned in parallel by batch.py
+    'BATCH_CONNECTIONS': 32,  # Requests in flight across all batch processes
+    'BATCH_REQUESTS_PER_SECOND': 0,  # Request rate across all batch processes (0 disables)
+    'BATCH_SITES_PER_PROCESS': 50  # Replace a worker process after this many sites
 }
@@ -0,0 +1,194 @@
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from urllib.parse import urldefrag, urlparse
+
+import config
+from journal import CrawlJournal
+from urls import page_key, is_same_domain, is_page_url
+
+
+class Crawler:
+    """Same-domain multi-page crawler that clones every page it reaches"""
+
+    def __init__(self, scraper, max_depth=2, max_pages=100, workers=4, resume=False, start_urls=None):
+        self.scraper = scraper
+        self.start_urls = start_urls or [scraper.base_url]
+        # Hosts in scope: the start URL's, plus the one its page redirects to
+        # (example.com -> www.example.com, http -> https on another port)
+        self.domains = {scraper.domain.lower()}
+        self.logger = scraper.logger
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.workers = workers
+        self.resume = resume
+        self.seen = set()
+        self.frontier = deque()
+        self.pages = []
+        self.failed = []
+
+        # Progress journal, so an interrupted crawl can continue with --resume
+        self.journal = CrawlJournal(
+            os.path.join(scraper.data_dir, 'crawl_journal.jsonl'),
+            config.DEFAULT_CONFIG['CRAWL_CHECKPOINT_INTERVAL']
+        )
+
+    def enqueue(self, url, depth):
+        """Add a URL to the frontier unless it was already seen or is out of scope"""
+        if depth > self.max_depth or len(self.seen) >= self.max_pages:
+            return False
+        if not is_page_url(url) or not any(is_same_domain(url, domain) for domain in self.domains):
+            return False
+
+        # The normalized key only deduplicates; the page is fetched at the URL as linked,
+        # since dropping a trailing slash changes how its relative links resolve
+        key = page_key(url)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        url = urldefrag(url)[0]
+        self.frontier.append((url, depth))
+        self.journal.record('discovered', url=url, depth=depth)
+        return True
+
+    def restore(self):
+        """Load an earlier run's journal: keep finished pages, queue everything else
+
+        Pages whose HTML file is missing are cloned again. Returns False if
+        there is nothing to resume from.
+        """
+        state = self.journal.load()
+        if not state['discovered']:
+            return False
+
+        self.seen.update(page_key(url) for url in state['discovered'])
+        for url, page in state['done'].items():
+            self.add_start_host(page)
+            if page.get('path') and os.path.exists(os.path.join(self.scraper.base_dir, page['path'])):
+                self.pages.append(page)
+        finished = {page['url'] for page in self.pages}
+        pending = [(url, depth) for url, depth in state['discovered'].items() if url not in finished]
+        self.frontier.extend(sorted(pending, key=lambda item: item[1]))
+
+        retried = sum(1 for url, _ in pending if url in state['failed'])
+        self.logger.info(f'Resuming crawl: {len(self.pages)} pages done, {len(pending)} to go '
+                         f'({retried} failed earlier and will be retried)')
+        return True
+
+    def checkpoint(self, force=False):
+        """Persist validators and the journal so a crash loses at most one checkpoint interval"""
+        if force or self.journal.checkpoint_due():
+            self.scraper.http_cache.save()
+            # Records first, so a page the journal marks done never lacks its records
+            self.scraper.checkpoint_records()
+            self.journal.checkpoint()
+
+    def crawl(self):
+        """Crawl from the start URLs (the scraper's base URL by default) and clone each page"""
+        self.logger.info(f'Starting crawl: {self.scraper.base_url} '
+                         f'(max depth {self.max_depth}, max pages {self.max_pages})')
+        resumed = self.resume and self.restore()
+        self.journal.open(append=resumed)
+        # A resumed crawl adds to the record files of the pages it already cloned
+        self.scraper.open_records(append=resumed)
+        if not resumed:
+            for url in self.start_urls:
+                self.enqueue(url, 0)
+
+        self.scraper.crawling = True
+        in_flight = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='crawl') as executor:
+                while self.frontier or in_flight:
+                    while self.frontier and len(in_flight) < self.workers:
+                        url, depth = self.frontier.popleft()
+                        future = executor.submit(self.scraper.clone_website, url)
+                        in_flight[future] = (url, depth)
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url, depth = in_flight.pop(future)
+                        self.handle_result(url, depth, future)
+                    self.checkpoint()
+        finally:
+            self.scraper.crawling = False
+            self.checkpoint(force=True)
+            self.journal.close()
+            self.scraper.close_records()
+
+        self.save_summary()
+        self.logger.info(f'Crawl finished: {len(self.pages)} pages cloned, {len(self.failed)} failed')
+        return {
+            'pages': self.pages,
+            'failed': self.failed
+        }
+
+    def handle_result(self, url, depth, future):
+        """Record a finished page and feed its links into the frontier"""
+        error = 'Clone failed'
+        try:
+            data = future.result()
+        except Exception as e:
+            self.logger.error(f'Error crawling {url}: {str(e)}')
+            error = str(e)
+            data = None
+
+        if not data:
+            self.failed.append(url)
+            self.journal.record('failed', url=url, depth=depth, error=error)
+            return
+
+        page = {
+            'url': url,
+            'path': data.get('html_file'),
+            'depth': depth
+        }
+        if data.get('final_url', url) != url:
+            page['final_url'] = data['final_url']
+        self.add_start_host(page)
+        self.pages.append(page)
+        self.journal.record('done', outputs=self.page_outputs(data), **page)
+        for link in data.get('links', []):
+            self.enqueue(link, depth + 1)
+
+    def add_start_host(self, page):
+        """Bring the host a start page redirected to into scope"""
+        if page.get('depth') == 0 and page.get('final_url'):
+            self.domains.add(urlparse(page['final_url']).netloc.lower())
+
+    def page_outputs(self, data):
+        """Files written for a cloned page, relative to the site directory"""
+        page_dir = os.path.dirname(data['html_file'])
+        return (
+            [data['html_file'],
+             os.path.join(page_dir, data['css_file']),
+             os.path.join(page_dir, data['js_file'])]
+            + [os.path.join('css', name) for name in data.get('css_files', [])]
+            + [os.path.join('js', name) for name in data.get('js_files', [])]
+            + [os.path.join('images', image['filename']) for image in data.get('images', [])]
+        )
+
+    def save_summary(self):
+        """Save the list of crawled pages to crawl.json"""
+        summary = {
+            'url': self.scraper.base_url,
+            'domain': self.scraper.domain,
+            'crawl_date': datetime.now().isoformat(),
+            'stats': {
+                'pages_count': len(self.pages),
+                'failed_count': len(self.failed),
+                'discovered_count': len(self.seen),
+                'fetches_saved': self.scraper.http_cache.saved
+            },
+            'pages': self.pages,
+            'failed': self.failed
+        }
+
+        summary_file = os.path.join(self.scraper.data_dir, 'crawl.json')
+        os.makedirs(self.scraper.data_dir, exist_ok=True)
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        self.logger.info(f'Crawl summary saved to: {summary_file}')
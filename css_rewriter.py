@@ -0,0 +1,347 @@
+import os
+import posixpath
+import re
+
+FONT_EXTENSIONS = {'.woff', '.woff2', '.ttf', '.otf', '.eot'}
+
+IMAGE_SET_PATTERN = re.compile(r'(?:-webkit-)?image-set\(', re.IGNORECASE)
+IDENT_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
+
+
+class CssReference:
+    """A URL referenced from a stylesheet
+
+    kind is 'url' for url(...) tokens, 'string' for bare strings inside
+    image-set(), and 'import' for a whole @import rule, in which case
+    conditions holds any media/layer/supports text after the URL.
+    """
+    __slots__ = ('kind', 'start', 'end', 'url', 'quote', 'conditions')
+
+    def __init__(self, kind, start, end, url, quote='', conditions=''):
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.url = url
+        self.quote = quote
+        self.conditions = conditions
+
+
+def _skip_comment(css, i):
+    end = css.find('*/', i + 2)
+    return len(css) if end == -1 else end + 2
+
+
+def _read_string(css, i):
+    """Read a quoted string starting at i; return (value, end)"""
+    quote = css[i]
+    j = i + 1
+    n = len(css)
+    while j < n:
+        c = css[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == quote or c == '\n':
+            break
+        j += 1
+    return css[i + 1:j], min(j + 1, n)
+
+
+def _skip_whitespace(css, i):
+    n = len(css)
+    while i < n and css[i] in ' \t\r\n\f':
+        i += 1
+    return i
+
+
+def _read_url(css, i):
+    """Read a url( token whose '(' is at i-1; return (value, quote, end)"""
+    i = _skip_whitespace(css, i)
+    n = len(css)
+    if i < n and css[i] in '"\'':
+        quote = css[i]
+        value, i = _read_string(css, i)
+        i = _skip_whitespace(css, i)
+        close = css.find(')', i)
+        return value, quote, n if close == -1 else close + 1
+    j = i
+    while j < n and css[j] != ')':
+        j += 2 if css[j] == '\\' else 1
+    return css[i:j].strip(), '', min(j + 1, n)
+
+
+def _statement_end(css, i):
+    """Find the ';' ending an at-rule, skipping strings, comments and parentheses"""
+    depth = 0
+    n = len(css)
+    while i < n:
+        c = css[i]
+        if c == '/' and css.startswith('/*', i):
+            i = _skip_comment(css, i)
+            continue
+        if c in '"\'':
+            _, i = _read_string(css, i)
+            continue
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth = max(depth - 1, 0)
+        elif (c == ';' and depth == 0) or c in '{}':
+            return i
+        i += 1
+    return n
+
+
+def _is_ident_start(css, i):
+    return i == 0 or css[i - 1] not in IDENT_CHARS
+
+
+def scan_css(css):
+    """Find every URL reference in a stylesheet in one pass
+
+    Comments and strings are skipped properly, so url( inside a comment or
+    a content: string is not mistaken for a reference.
+    """
+    references = []
+    image_set_depths = []  # Paren depths at which image-set() calls are open
+    depth = 0
+    i = 0
+    n = len(css)
+    lower = css.lower()
+
+    while i < n:
+        c = css[i]
+        if c == '/' and css.startswith('/*', i):
+            i = _skip_comment(css, i)
+        elif c in '"\'':
+            value, end = _read_string(css, i)
+            if image_set_depths and depth == image_set_depths[-1]:
+                references.append(CssReference('string', i, end, value, c))
+            i = end
+        elif c in 'uU' and lower.startswith('url(', i) and _is_ident_start(css, i):
+            value, quote, end = _read_url(css, i + 4)
+            references.append(CssReference('url', i, end, value, quote))
+            i = end
+        elif c == '@' and lower.startswith('@import', i):
+            j = _skip_whitespace(css, i + 7)
+            if j < n and css[j] in '"\'':
+                value, quote = _read_string(css, j)[0], css[j]
+                after = _read_string(css, j)[1]
+            elif lower.startswith('url(', j):
+                value, quote, after = _read_url(css, j + 4)
+            else:
+                i += 7
+                continue
+            end = _statement_end(css, after)
+            conditions = css[after:end].strip()
+            if end < n and css[end] == ';':
+                end += 1
+            references.append(CssReference('import', i, end, value, quote, conditions))
+            i = end
+        elif c in 'i-' and _is_ident_start(css, i) and IMAGE_SET_PATTERN.match(css, i):
+            match = IMAGE_SET_PATTERN.match(css, i)
+            depth += 1
+            image_set_depths.append(depth)
+            i = match.end()
+        elif c == '(':
+            depth += 1
+            i += 1
+        elif c == ')':
+            if image_set_depths and image_set_depths[-1] == depth:
+                image_set_depths.pop()
+            depth = max(depth - 1, 0)
+            i += 1
+        else:
+            i += 1
+
+    return references
+
+
+def format_reference(reference, url):
+    """Format a replacement URL the way the original reference was written"""
+    quote = reference.quote
+    if reference.kind == 'url':
+        if not quote and re.search(r'[\s()\'"]', url):
+            quote = '"'
+        return f'url({quote}{url}{quote})'
+    quote = quote or '"'
+    return f'{quote}{url}{quote}'
+
+
+def rewrite_css(css, replacements):
+    """Apply (reference, text) replacements in a single pass
+
+    Each reference's span is replaced exactly once; everything else is
+    copied through untouched.
+    """
+    parts = []
+    position = 0
+    for reference, text in sorted(replacements, key=lambda item: item[0].start):
+        if text is None or reference.start < position:
+            continue
+        parts.append(css[position:reference.start])
+        parts.append(text)
+        position = reference.end
+    parts.append(css[position:])
+    return ''.join(parts)
+
+
+def _balanced(text, i):
+    """Return the index just past the parenthesis group starting at text[i] == '('"""
+    depth = 0
+    for j in range(i, len(text)):
+        if text[j] == '(':
+            depth += 1
+        elif text[j] == ')':
+            depth -= 1
+            if depth == 0:
+                return j + 1
+    return len(text)
+
+
+def wrap_import(css, conditions):
+    """Wrap inlined @import content in the @layer/@supports/@media its rule named"""
+    css = re.sub(r'^\s*@charset\s+[^;]*;', '', css, flags=re.IGNORECASE)
+    conditions = conditions.strip()
+    wrappers = []
+
+    match = re.match(r'layer\b', conditions, re.IGNORECASE)
+    if match:
+        end = match.end()
+        if conditions[end:end + 1] == '(':
+            close = _balanced(conditions, end)
+            wrappers.append(f'@layer {conditions[end + 1:close - 1].strip()}')
+            conditions = conditions[close:].strip()
+        else:
+            wrappers.append('@layer')
+            conditions = conditions[end:].strip()
+
+    match = re.match(r'supports\s*(?=\()', conditions, re.IGNORECASE)
+    if match:
+        close = _balanced(conditions, match.end())
+        wrappers.append(f'@supports {conditions[match.end():close]}')
+        conditions = conditions[close:].strip()
+
+    if conditions:
+        wrappers.append(f'@media {conditions}')
+
+    for wrapper in reversed(wrappers):
+        css = f'{wrapper} {{\n{css}\n}}'
+    return css
+
+
+def is_local_reference(url):
+    """Check whether a reference is a relative path (not data:, #fragment or absolute)"""
+    return bool(url) and not url.startswith(('#', '/')) and not re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*:', url)
+
+
+def rebase_css_urls(css, from_dir, to_dir):
+    """Rewrite relative url() references so they resolve from to_dir instead of from_dir"""
+    replacements = []
+    for reference in scan_css(css):
+        if reference.kind == 'import' or not is_local_reference(reference.url):
+            continue
+        target = os.path.normpath(os.path.join(from_dir, reference.url))
+        rebased = os.path.relpath(target, to_dir).replace(os.sep, posixpath.sep)
+        replacements.append((reference, format_reference(reference, rebased)))
+    return rewrite_css(css, replacements)
+
+
+# No whitespace is needed next to these; ':' only sheds the space after it,
+# since 'a :hover' and 'a:hover' are different selectors
+TIGHT_BEFORE = set('{};,>')
+TIGHT_AFTER = set('{};,>:')
+
+
+def minify_css(css):
+    """Strip comments and collapse whitespace without touching strings or url()s
+
+    /*! ... */ comments are kept, as they usually carry licenses.
+    """
+    out = []
+    space = False
+    i = 0
+    n = len(css)
+    lower = css.lower()
+
+    while i < n:
+        c = css[i]
+        if c == '/' and css.startswith('/*', i):
+            end = _skip_comment(css, i)
+            if css.startswith('/*!', i):
+                out.append(css[i:end])
+            else:
+                space = True
+            i = end
+            continue
+        if c in ' \t\r\n\f':
+            space = True
+            i += 1
+            continue
+
+        if c in '"\'':
+            end = _read_string(css, i)[1]
+        elif c in 'uU' and lower.startswith('url(', i) and _is_ident_start(css, i):
+            end = _read_url(css, i + 4)[2]
+        else:
+            end = i + 1
+        token = css[i:end]
+
+        if c == '}' and out and out[-1] == ';':
+            out.pop()  # Last declaration needs no semicolon
+        elif space and out and out[-1][-1] not in TIGHT_AFTER and c not in TIGHT_BEFORE:
+            out.append(' ')
+        space = False
+        out.append(token)
+        i = end
+
+    return ''.join(out)
+
+
+def split_statements(css):
+    """Split a stylesheet into top-level statements (rules, at-rule blocks and ; statements)"""
+    statements = []
+    depth = 0
+    start = 0
+    i = 0
+    n = len(css)
+    while i < n:
+        c = css[i]
+        if c == '/' and css.startswith('/*', i):
+            i = _skip_comment(css, i)
+            continue
+        if c in '"\'':
+            i = _read_string(css, i)[1]
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth = max(depth - 1, 0)
+            if depth == 0:
+                statements.append(css[start:i + 1])
+                start = i + 1
+        elif c == ';' and depth == 0:
+            statements.append(css[start:i + 1])
+            start = i + 1
+        i += 1
+    if css[start:].strip():
+        statements.append(css[start:])
+    return statements
+
+
+def dedupe_css(css):
+    """Drop repeated rule blocks (including @font-face), keeping the last copy
+
+    An identical later block wins the cascade anyway, so removing the
+    earlier copies never changes which declarations apply.
+    """
+    kept = []
+    seen = set()
+    for statement in reversed(split_statements(css)):
+        key = statement.strip()
+        if key.endswith('}'):
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(statement)
+    return ''.join(reversed(kept))
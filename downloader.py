@@ -0,0 +1,177 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace requests to a host"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+class GlobalLimits:
+    """Request concurrency and rate limits shared by every process of a batch run
+
+    Built from multiprocessing primitives, so it is created once in the
+    parent and handed to pool workers when they start.
+    """
+
+    def __init__(self, connections=None, rate=None):
+        self.slots = multiprocessing.BoundedSemaphore(connections) if connections else None
+        self.rate = rate or None
+        self.capacity = max(1, rate) if rate else None
+        # Token bucket state: [tokens, last refill]; CLOCK_MONOTONIC is shared by all processes
+        self.state = multiprocessing.Array('d', [self.capacity, time.monotonic()]) if rate else None
+
+    def acquire_token(self):
+        while True:
+            with self.state.get_lock():
+                now = time.monotonic()
+                tokens = min(self.capacity, self.state[0] + (now - self.state[1]) * self.rate)
+                self.state[1] = now
+                if tokens >= 1:
+                    self.state[0] = tokens - 1
+                    return
+                self.state[0] = tokens
+                delay = (1 - tokens) / self.rate
+            time.sleep(delay)
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the global connections and take a token for the duration of a request"""
+        if self.slots:
+            self.slots.acquire()
+        try:
+            if self.state is not None:
+                self.acquire_token()
+            yield
+        finally:
+            if self.slots:
+                self.slots.release()
+
+
+class DownloadLimitError(Exception):
+    """Raised when a download would exceed its per-file or per-run byte limit"""
+
+
+class ByteBudget:
+    """Thread-safe count of downloaded bytes against an optional limit"""
+
+    def __init__(self, limit=None):
+        self.limit = limit or None
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def consume(self, size):
+        """Charge size bytes, raising DownloadLimitError if the limit would be passed"""
+        with self.lock:
+            if self.limit and self.used + size > self.limit:
+                raise DownloadLimitError(f'Run byte budget of {self.limit} bytes exhausted')
+            self.used += size
+
+
+class DownloadEngine:
+    """Bounded-concurrency engine that all asset fetches go through"""
+
+    def __init__(self, session, workers=8, per_host=4, rate=None, burst=None,
+                 max_file_bytes=None, max_run_bytes=None, chunk_size=65536, metrics=None,
+                 global_limits=None):
+        self.session = session
+        self.metrics = metrics
+        self.global_limits = global_limits
+        self.workers = workers
+        self.per_host = per_host
+        self.rate = rate
+        self.burst = burst
+        self.max_file_bytes = max_file_bytes or None
+        self.budget = ByteBudget(max_run_bytes)
+        self.chunk_size = chunk_size
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='download',
+            initializer=self._mark_worker
+        )
+
+    def _mark_worker(self):
+        self._local.worker = True
+
+    def _host_limits(self, url):
+        """Return the (semaphore, bucket) pair for the URL's host"""
+        host = urlparse(url).netloc
+        with self._lock:
+            limits = self._hosts.get(host)
+            if limits is None:
+                bucket = TokenBucket(self.rate, self.burst) if self.rate else None
+                limits = self._hosts[host] = (threading.BoundedSemaphore(self.per_host), bucket)
+            return limits
+
+    @contextmanager
+    def request(self, url, **kwargs):
+        """GET a URL while holding its host slot and politeness token"""
+        slot, bucket = self._host_limits(url)
+        with slot, self.global_limits.slot() if self.global_limits else nullcontext():
+            if bucket:
+                bucket.acquire()
+            start = time.perf_counter()
+            response = self.session.get(url, **kwargs)
+            if self.metrics:
+                self.metrics.observe_latency(urlparse(url).netloc, time.perf_counter() - start)
+            try:
+                yield response
+            finally:
+                response.close()
+
+    def iter_body(self, response, offset=0):
+        """Yield a streamed response body in chunks within the per-file and per-run limits
+
+        offset is the number of bytes already held from an earlier partial
+        download, counted against the per-file limit.
+        """
+        length = response.headers.get('content-length', '')
+        if self.max_file_bytes and length.isdigit() and offset + int(length) > self.max_file_bytes:
+            raise DownloadLimitError(
+                f'{response.url} is {offset + int(length)} bytes, over the {self.max_file_bytes} byte limit'
+            )
+        size = offset
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            size += len(chunk)
+            if self.max_file_bytes and size > self.max_file_bytes:
+                raise DownloadLimitError(f'{response.url} exceeded the {self.max_file_bytes} byte limit')
+            self.budget.consume(len(chunk))
+            yield chunk
+
+    def map(self, func, items):
+        """Run func over items on the pool and return results in input order"""
+        items = list(items)
+        # Nested calls from a pool thread run inline so they cannot starve the pool
+        if getattr(self._local, 'worker', False) or len(items) < 2:
+            return [func(item) for item in items]
+        futures = [self.executor.submit(func, item) for item in items]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,235 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+from contextlib import contextmanager
+import config
+
+logger = logging.getLogger(__name__)
+
+CHROME_NAMES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+_browser = None
+_browser_lock = threading.Lock()
+
+
+def resolve_browser(refresh=False):
+    """Return {'driver_path', 'chrome_binary', 'cached'}, looking them up only once
+
+    The first lookup asks webdriver_manager for a matching chromedriver,
+    which can need the network. The result is saved to DRIVER_CACHE_FILE,
+    so later runs (and every later driver in this process) start Chrome
+    without any lookup. CHROMEDRIVER_PATH and CHROME_BINARY skip the
+    lookup entirely. refresh discards the cached locations.
+    """
+    global _browser
+    settings = config.DEFAULT_CONFIG
+    cache_file = settings['DRIVER_CACHE_FILE']
+    with _browser_lock:
+        if _browser is not None and not refresh:
+            return _browser
+
+        browser = None
+        if not refresh and cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    browser = json.load(f)
+                if not os.path.exists(browser['driver_path']):
+                    browser = None
+                else:
+                    browser['cached'] = True
+            except (OSError, ValueError, KeyError, TypeError):
+                browser = None
+
+        if browser is None:
+            driver_path = settings['CHROMEDRIVER_PATH']
+            if not driver_path:
+                from webdriver_manager.chrome import ChromeDriverManager
+                logger.info('Resolving chromedriver')
+                driver_path = ChromeDriverManager().install()
+            chrome_binary = next(filter(None, map(shutil.which, CHROME_NAMES)), None)
+            browser = {'driver_path': driver_path, 'chrome_binary': chrome_binary}
+            if cache_file:
+                os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+                tmp_path = f'{cache_file}.{os.getpid()}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(browser, f)
+                os.replace(tmp_path, cache_file)
+
+        if settings['CHROMEDRIVER_PATH']:
+            browser['driver_path'] = settings['CHROMEDRIVER_PATH']
+        if settings['CHROME_BINARY']:
+            browser['chrome_binary'] = settings['CHROME_BINARY']
+        _browser = browser
+        return browser
+
+
+def create_driver():
+    """Start a headless Chrome instance"""
+    # Selenium is only imported once a page actually needs a browser
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+
+    browser = resolve_browser()
+    chrome_options = Options()
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    if config.DEFAULT_CONFIG['BROWSER_CAPTURE']:
+        # Network events go to the performance log, where captured responses are read from
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    if browser['chrome_binary']:
+        chrome_options.binary_location = browser['chrome_binary']
+    try:
+        return webdriver.Chrome(service=Service(browser['driver_path']), options=chrome_options)
+    except Exception as e:
+        if config.DEFAULT_CONFIG['CHROMEDRIVER_PATH'] or not browser.get('cached'):
+            raise
+        # Chrome may have been updated past the cached chromedriver
+        logger.warning(f'Cached chromedriver failed to start, resolving it again: {str(e)}')
+        browser = resolve_browser(refresh=True)
+        if browser['chrome_binary']:
+            chrome_options.binary_location = browser['chrome_binary']
+        return webdriver.Chrome(service=Service(browser['driver_path']), options=chrome_options)
+
+
+class DriverPool:
+    """Pool of warm headless Chrome instances shared across scrapes
+
+    Drivers are started on demand up to size, reset between pages and
+    recycled after max_pages pages or as soon as one stops responding.
+    """
+
+    def __init__(self, size=2, max_pages=50, factory=create_driver):
+        self.size = size
+        self.max_pages = max_pages
+        self.factory = factory
+        self.idle = queue.LifoQueue()  # Most recently used (warmest) first
+        self.slots = threading.BoundedSemaphore(size)
+        self.pages = {}
+        self.lock = threading.Lock()
+        self.closed = False
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver for one page"""
+        if self.closed:
+            raise RuntimeError('Driver pool is closed')
+        with self.slots:
+            driver = self.checkout()
+            try:
+                yield driver
+            except Exception:
+                if self.is_alive(driver):
+                    self.checkin(driver)
+                else:
+                    logger.warning('Driver crashed, discarding it')
+                    self.discard(driver)
+                raise
+            else:
+                self.checkin(driver)
+
+    def checkout(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return self.create()
+
+    def create(self):
+        logger.info('Starting headless Chrome')
+        driver = self.factory()
+        with self.lock:
+            self.pages[id(driver)] = 0
+        return driver
+
+    def checkin(self, driver):
+        """Reset a driver and return it to the pool, or recycle it"""
+        with self.lock:
+            self.pages[id(driver)] = self.pages.get(id(driver), 0) + 1
+            used = self.pages[id(driver)]
+
+        if self.closed or used >= self.max_pages:
+            self.discard(driver)
+            return
+        try:
+            self.reset(driver)
+        except Exception as e:
+            logger.warning(f'Error resetting driver, discarding it: {str(e)}')
+            self.discard(driver)
+            return
+        self.idle.put(driver)
+
+    @staticmethod
+    def reset(driver):
+        """Clear cookies and storage so the next page starts clean"""
+        driver.execute_script('try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}')
+        try:
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        except Exception:
+            driver.delete_all_cookies()
+        driver.get('about:blank')
+
+    @staticmethod
+    def is_alive(driver):
+        try:
+            driver.execute_script('return 1')
+            return True
+        except Exception:
+            return False
+
+    def discard(self, driver):
+        with self.lock:
+            self.pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f'Error quitting driver: {str(e)}')
+
+    def warm(self, count=None):
+        """Start drivers ahead of time so the first pages don't pay the launch"""
+        for _ in range(min(count or self.size, self.size) - self.idle.qsize()):
+            self.idle.put(self.create())
+
+    def close(self):
+        """Quit every idle driver; borrowed drivers are quit when returned"""
+        self.closed = True
+        while True:
+            try:
+                self.discard(self.idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool():
+    """Return the process-wide driver pool, creating it on first use"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            settings = config.DEFAULT_CONFIG
+            _default_pool = DriverPool(
+                size=settings['DRIVER_POOL_SIZE'],
+                max_pages=settings['DRIVER_MAX_PAGES']
+            )
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+
+def close_default_pool():
+    """Close the process-wide driver pool if one was created"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is not None:
+            _default_pool.close()
+            _default_pool = None
@@ -0,0 +1,55 @@
+import re
+
+RENDER_MODES = ('auto', 'static', 'browser')
+
+# Pages with less visible text than this are assumed to be built by JavaScript
+MIN_TEXT_LENGTH = 200
+
+# Elements whose text never shows on the page
+HIDDEN_TAGS = {'script', 'style', 'noscript', 'template'}
+
+# Empty mount points left in the HTML by client-side frameworks
+SPA_ROOT_PATTERN = re.compile(
+    r'<(div|main|app-root)[^>]+id=["\'](root|app|__next|__nuxt|svelte|main-app)["\'][^>]*>\s*</\1>',
+    re.IGNORECASE
+)
+
+NOSCRIPT_PATTERN = re.compile(
+    r'<noscript[^>]*>.*?(enable javascript|requires javascript|javascript is (disabled|required)).*?</noscript>',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def needs_javascript(html, soup=None):
+    """Decide whether a statically fetched page must be rendered in a browser
+
+    Returns the reason as a string, or None when the static HTML is usable.
+    An already parsed soup of html can be passed in; it is not modified.
+    """
+    if not html or not html.strip():
+        return 'empty document'
+    if SPA_ROOT_PATTERN.search(html):
+        return 'empty SPA root element'
+    if NOSCRIPT_PATTERN.search(html):
+        return 'noscript warning'
+
+    if soup is None:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+    has_scripts = soup.find('script') is not None
+    if has_scripts and visible_text_length(soup.body or soup) < MIN_TEXT_LENGTH:
+        return 'almost empty body'
+    return None
+
+
+def visible_text_length(element):
+    """Length of element.get_text(strip=True), leaving out script, style, noscript and template content"""
+    from bs4.element import CData, NavigableString
+    length = 0
+    for string in element.find_all(string=True):
+        if type(string) not in (NavigableString, CData):
+            continue  # Comments, doctypes and script/style/template strings
+        if any(parent.name in HIDDEN_TAGS for parent in string.parents):
+            continue
+        length += len(string.strip())
+    return length
@@ -0,0 +1,105 @@
+import importlib.util
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# BeautifulSoup tree builders, fastest first. lxml is C-backed; html.parser
+# is pure Python but always available.
+PARSER_BACKENDS = ('lxml', 'html.parser')
+
+CHARSET_PATTERN = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+
+def parser_available(name):
+    # find_spec checks for the package without paying for its import
+    return name == 'html.parser' or importlib.util.find_spec(name) is not None
+
+
+def resolve_parser(name='auto'):
+    """Return the tree builder for name, where 'auto' picks the fastest one installed
+
+    An unavailable backend falls back to html.parser with a warning.
+    """
+    if name in (None, 'auto'):
+        return next(backend for backend in PARSER_BACKENDS if parser_available(backend))
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f'Unknown HTML parser {name!r}, expected one of {", ".join(PARSER_BACKENDS)}')
+    if not parser_available(name):
+        logger.warning(f'{name} is not installed, falling back to html.parser')
+        return 'html.parser'
+    return name
+
+
+def decode_html(content, content_type=''):
+    """Decode a page body to text
+
+    A charset in the Content-Type header wins; without one the page's own
+    byte order mark or <meta charset> is used, then a guess. (requests would
+    assume ISO-8859-1 for any text/html response without a charset.)
+    """
+    from bs4.dammit import UnicodeDammit
+    match = CHARSET_PATTERN.search(content_type or '')
+    return UnicodeDammit(content, [match.group(1)] if match else [], is_html=True).unicode_markup
+
+
+def parse_html(html, parser='html.parser'):
+    # bs4 is imported on first use, so the first request is not held up by it
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, parser)
+
+
+def document_head(soup):
+    """Return the document's <head>, creating it when the markup has none
+
+    HTML5 lets a page leave out <head> and <body>; html.parser then builds
+    no such tags (Chrome's page_source and lxml always have them).
+    """
+    if soup.head is None:
+        parent = soup.html or soup
+        # Before the first element, so a leading doctype stays first
+        index = next((i for i, child in enumerate(parent.contents) if child.name), len(parent.contents))
+        parent.insert(index, soup.new_tag('head'))
+    return soup.head
+
+
+def document_body(soup):
+    """Return the document's <body>, or the element to append to when there is none"""
+    return soup.body or soup.html or soup
+
+
+def iter_html(soup, formatter='minimal', encoding='utf-8'):
+    """Yield a document's markup piece by piece, without pretty-printing
+
+    Unlike str(soup) or soup.prettify(), the whole document is never held
+    as a single string, so it can be written out as it is produced. The
+    pieces come from bs4's own (private) serializer; when this bs4 does not
+    have it, the document is decoded in one piece instead.
+    """
+    from bs4.element import Tag
+    events = ('START_ELEMENT_EVENT', 'EMPTY_ELEMENT_EVENT', 'END_ELEMENT_EVENT')
+    if not (hasattr(soup, '_event_stream') and hasattr(soup, '_format_tag')
+            and all(hasattr(Tag, event) for event in events)):
+        yield soup.decode(eventual_encoding=encoding, formatter=formatter)  # bs4 < 4.12.1
+        return
+    formatter = soup.formatter_for_name(formatter)
+    for event, element in soup._event_stream():
+        if event in (Tag.START_ELEMENT_EVENT, Tag.EMPTY_ELEMENT_EVENT):
+            yield element._format_tag(encoding, formatter, opening=True)
+        elif event is Tag.END_ELEMENT_EVENT:
+            yield element._format_tag(encoding, formatter, opening=False)
+        else:
+            yield element.output_ready(formatter)
+
+
+def write_html(soup, path, encoding='utf-8'):
+    """Serialize a document straight to a file"""
+    with open(path, 'w', encoding=encoding) as f:
+        try:
+            f.writelines(iter_html(soup, encoding=encoding))
+        except (AttributeError, TypeError) as e:
+            # The streaming serializer relies on bs4 internals that may change between releases
+            logger.warning(f'Streaming serializer failed ({str(e)}), writing {path} in one piece')
+            f.seek(0)
+            f.truncate()
+            f.write(soup.decode(eventual_encoding=encoding, formatter='minimal'))
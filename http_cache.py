@@ -0,0 +1,85 @@
+import json
+import os
+import re
+import threading
+import time
+
+
+class ValidatorCache:
+    """Persistent per-URL HTTP validators used for conditional re-fetches
+
+    Stores the ETag, Last-Modified and Cache-Control headers of every asset
+    response so the next run can send If-None-Match / If-Modified-Since and
+    reuse the local copy on a 304, or skip the request entirely while the
+    response is still fresh.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.stats = {'fetched': 0, 'not_modified': 0, 'fresh': 0}
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except ValueError:
+            self.entries = {}  # Corrupt cache only costs a full re-fetch
+
+    def save(self):
+        """Write the cache atomically"""
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def conditional_headers(self, url):
+        """Return If-None-Match / If-Modified-Since headers for a URL"""
+        entry = self.entries.get(url, {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_fresh(self, url):
+        """Check whether the cached response is still fresh per its Cache-Control"""
+        entry = self.entries.get(url)
+        if not entry:
+            return False
+        cache_control = (entry.get('cache_control') or '').lower()
+        if 'no-cache' in cache_control or 'no-store' in cache_control:
+            return False
+        match = re.search(r'max-age=(\d+)', cache_control)
+        if not match:
+            return False
+        return time.time() - entry.get('fetched_at', 0) < int(match.group(1))
+
+    def update(self, url, headers, not_modified=False):
+        """Record the validators from a 200 or 304 response"""
+        with self.lock:
+            entry = self.entries.get(url, {}) if not_modified else {}
+            # A 304 may omit validators; keep the ones we already have
+            for key, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified'),
+                                ('cache_control', 'Cache-Control')):
+                if headers.get(header):
+                    entry[key] = headers[header]
+            entry['fetched_at'] = time.time()
+            self.entries[url] = entry
+            self.stats['not_modified' if not_modified else 'fetched'] += 1
+
+    def note_fresh(self):
+        with self.lock:
+            self.stats['fresh'] += 1
+
+    @property
+    def saved(self):
+        """Number of downloads avoided through 304s and fresh responses"""
+        return self.stats['not_modified'] + self.stats['fresh']
@@ -0,0 +1,223 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+from process_pool import ProcessPool
+
+logger = logging.getLogger(__name__)
+
+# Pillow format name -> (file extension, content type)
+IMAGE_FORMATS = {
+    'JPEG': ('.jpg', 'image/jpeg'),
+    'PNG': ('.png', 'image/png'),
+    'WEBP': ('.webp', 'image/webp'),
+    'AVIF': ('.avif', 'image/avif')
+}
+
+# Quality used for resized copies when only lossless recompression is asked for
+RESIZE_QUALITY = 90
+
+
+def save_image(image, fmt, quality, strip_metadata, icc_profile, exif, original=False):
+    """Encode image in fmt and return the bytes"""
+    options = {'icc_profile': icc_profile} if icc_profile else {}
+    if exif and not strip_metadata:
+        options['exif'] = exif
+    if fmt == 'JPEG':
+        if image.mode not in ('RGB', 'L', 'CMYK'):
+            image = image.convert('RGB')
+        if quality is None and original and image.format == 'JPEG':
+            options['quality'] = 'keep'  # Re-use the source tables; only the entropy coding changes
+        else:
+            options['quality'] = quality or RESIZE_QUALITY
+        options.update(optimize=True, progressive=True)
+    elif fmt == 'PNG':
+        options['optimize'] = True
+    elif fmt == 'WEBP':
+        options.update({'lossless': True} if quality is None else {'quality': quality})
+        options['method'] = 6
+    elif fmt == 'AVIF':
+        options['quality'] = quality or RESIZE_QUALITY
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def encode_image(job):
+    """Re-encode one stored image into its srcset widths and extra formats
+
+    job is (source_path, spec). Returns None for images that are not
+    re-encoded (SVG, animations, unreadable files), otherwise a dict with
+    the source dimensions and a list of (format, width, bytes) outputs.
+    bytes is None where the full-size re-encode was no smaller than the
+    source, meaning the source file itself should be used.
+    """
+    from PIL import Image, ImageOps
+
+    source_path, spec = job
+    with open(source_path, 'rb') as f:
+        source = f.read()
+    try:
+        image = Image.open(io.BytesIO(source))
+        image.load()
+    except Exception:
+        return None
+    source_format = image.format
+    if source_format not in IMAGE_FORMATS or getattr(image, 'is_animated', False):
+        return None
+
+    exif = image.info.get('exif')
+    icc_profile = image.info.get('icc_profile')
+    if spec['strip_metadata'] and exif:
+        image = ImageOps.exif_transpose(image)  # Orientation lives in the EXIF being dropped
+    width, height = image.size
+
+    widths = sorted({w for w in spec['widths'] if w < width} | {width})
+    outputs = []
+    for fmt in [source_format] + [fmt for fmt in spec['formats'] if fmt != source_format]:
+        for target in widths:
+            resized = image if target == width else image.resize(
+                (target, max(1, round(height * target / width))), Image.LANCZOS
+            )
+            data = save_image(resized, fmt, spec['quality'], spec['strip_metadata'], icc_profile, exif,
+                              original=target == width)
+            if fmt == source_format and target == width and len(data) >= len(source) \
+                    and not (spec['strip_metadata'] and exif):
+                data = None
+            outputs.append((fmt, target, data))
+    return {'format': source_format, 'width': width, 'height': height, 'outputs': outputs}
+
+
+class ImageOptimizer:
+    """Post-download stage that re-encodes images into responsive variants
+
+    Encoding runs on a process pool. Results are cached in the asset store
+    under the source's SHA-256 and the encoding settings, so an image that
+    has not changed is never encoded twice. Needs Pillow; without it the
+    stage logs a warning and leaves images untouched.
+    """
+
+    def __init__(self, store, quality=82, formats=('webp',), widths=(480, 960, 1440),
+                 strip_metadata=True, workers=None):
+        self.store = store
+        self.pool = ProcessPool(workers)
+        self.cache_dir = os.path.join(store.root, 'optimized')
+        self.spec = {
+            'quality': quality,
+            'formats': [fmt.upper() for fmt in formats or () if fmt.upper() in IMAGE_FORMATS],
+            'widths': sorted(widths or ()),
+            'strip_metadata': strip_metadata
+        }
+
+        try:
+            from PIL import Image, features
+        except ImportError:
+            self.available = False
+            logger.warning('Pillow is not installed, images will not be optimized')
+            return
+        self.available = True
+        Image.init()  # Registers the encoders listed in Image.SAVE
+        for fmt in list(self.spec['formats']):
+            if fmt not in Image.SAVE or (fmt in ('WEBP', 'AVIF') and not features.check(fmt.lower())):
+                logger.warning(f'Pillow cannot write {fmt}, skipping {fmt} variants')
+                self.spec['formats'].remove(fmt)
+        # Cached encodings are only valid for the settings they were made with
+        self.spec_key = hashlib.sha256(json.dumps(self.spec, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def manifest_path(self, digest):
+        return os.path.join(self.cache_dir, f'{digest}-{self.spec_key}.json')
+
+    def load_manifest(self, digest):
+        """Return the cached encoding of a source image ({} if it is not re-encoded), or None on a miss"""
+        try:
+            with open(self.manifest_path(digest), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not all(os.path.exists(self.store.object_path(output['digest']))
+                   for output in manifest.get('outputs', [])):
+            return None
+        return manifest
+
+    def save_manifest(self, digest, manifest):
+        path = self.manifest_path(digest)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def store_result(self, digest, result):
+        """Store encoded outputs as store objects and cache their manifest"""
+        manifest = {}
+        if result:
+            outputs = []
+            for fmt, width, data in result['outputs']:
+                content_type = IMAGE_FORMATS[fmt][1]
+                if data is None:
+                    record = {'digest': digest, 'size': os.path.getsize(self.store.object_path(digest))}
+                else:
+                    record = self.store.put_bytes(None, data, content_type)
+                outputs.append({
+                    'format': fmt,
+                    'width': width,
+                    'content_type': content_type,
+                    'digest': record['digest'],
+                    'size': record['size']
+                })
+            manifest = {'width': result['width'], 'height': result['height'],
+                        'format': result['format'], 'outputs': outputs}
+        self.save_manifest(digest, manifest)
+        return manifest
+
+    def optimize(self, images, images_dir):
+        """Encode downloaded images and link their variants into images_dir
+
+        Each image_info gains width, height and a variants list of
+        {filename, width, content_type, size}; the original file is kept.
+        """
+        if not self.available or not images:
+            return images
+
+        manifests = {}
+        pending = []
+        for image in images:
+            digest = image['sha256']
+            if digest in manifests or digest in pending:
+                continue
+            manifest = self.load_manifest(digest)
+            if manifest is not None:
+                manifests[digest] = manifest
+            else:
+                pending.append(digest)
+
+        if pending:
+            logger.info(f'Optimizing {len(pending)} images ({len(images) - len(pending)} cached)')
+            jobs = [(self.store.object_path(digest), self.spec) for digest in pending]
+            for digest, result in zip(pending, self.pool.map(encode_image, jobs)):
+                manifests[digest] = self.store_result(digest, result)
+
+        for image in images:
+            manifest = manifests.get(image['sha256'])
+            if not manifest:
+                continue
+            stem = os.path.splitext(image['filename'])[0]
+            image['width'] = manifest['width']
+            image['height'] = manifest['height']
+            image['variants'] = [
+                {
+                    'filename': self.store.materialize(
+                        output['digest'], images_dir, f'{stem}-{output["width"]}w{IMAGE_FORMATS[output["format"]][0]}'
+                    ),
+                    'width': output['width'],
+                    'content_type': output['content_type'],
+                    'size': output['size']
+                }
+                for output in manifest['outputs']
+            ]
+        return images
+
+    def close(self):
+        self.pool.close()
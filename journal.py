@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+import time
+
+
+class CrawlJournal:
+    """Append-only JSON-lines record of a crawl's progress
+
+    Every discovered, finished and failed URL is appended as one event.
+    Events are flushed and fsync'd at most every checkpoint_interval
+    seconds, so a crash loses at most that much progress. A truncated last
+    line from an interrupted write is ignored when the journal is loaded.
+    """
+
+    def __init__(self, path, checkpoint_interval=5):
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self.file = None
+        self.last_checkpoint = time.monotonic()
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Replay the journal into {'discovered': {url: depth}, 'done': {url: page}, 'failed': {url: error}}"""
+        state = {'discovered': {}, 'done': {}, 'failed': {}}
+        if not os.path.exists(self.path):
+            return state
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                url = event.get('url')
+                kind = event.get('event')
+                if kind == 'discovered':
+                    state['discovered'].setdefault(url, event['depth'])
+                elif kind == 'done':
+                    state['done'][url] = {key: event[key] for key in ('url', 'final_url', 'path', 'depth', 'outputs') if key in event}
+                    state['failed'].pop(url, None)
+                elif kind == 'failed' and url not in state['done']:
+                    state['failed'][url] = event.get('error')
+        return state
+
+    def open(self, append=False):
+        """Open the journal for writing, continuing it when append is set"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.file = open(self.path, 'a' if append else 'w', encoding='utf-8')
+        self.last_checkpoint = time.monotonic()
+
+    def record(self, event, **fields):
+        with self.lock:
+            self.file.write(json.dumps({'event': event, 'time': time.time(), **fields}, ensure_ascii=False) + '\n')
+
+    def checkpoint_due(self):
+        return time.monotonic() - self.last_checkpoint >= self.checkpoint_interval
+
+    def checkpoint(self):
+        """Flush buffered events and fsync them to disk"""
+        with self.lock:
+            if self.file:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            self.last_checkpoint = time.monotonic()
+
+    def close(self):
+        self.checkpoint()
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
@@ -1,11 +1,77 @@
+import time
+IMPORT_START = time.perf_counter()
 from scraper import WebScraper
+from crawler import Crawler
+from fetch_strategy import RENDER_MODES
+import argparse
+import config
 import logging
 import os
+import sys
+IMPORT_SECONDS = time.perf_counter() - IMPORT_START
+
+# Reported by --profile-startup as loaded or not
+HEAVY_MODULES = ('requests', 'bs4', 'lxml', 'selenium', 'webdriver_manager', 'PIL', 'httpx')
+
+def parse_args():
+    settings = config.DEFAULT_CONFIG
+    parser = argparse.ArgumentParser(description='Clone a website')
+    parser.add_argument('url', nargs='?', help='Website URL (prompted for if omitted)')
+    parser.add_argument('--crawl', action='store_true', help='Follow same-domain links and clone every page')
+    parser.add_argument('--max-depth', type=int, default=settings['CRAWL_MAX_DEPTH'], help='Maximum link depth when crawling')
+    parser.add_argument('--max-pages', type=int, default=settings['CRAWL_MAX_PAGES'], help='Maximum number of pages to crawl')
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue an interrupted crawl from its journal, retrying only failed and unfinished pages")
+    parser.add_argument('--workers', type=int, default=settings['CRAWL_WORKERS'], help='Pages processed concurrently when crawling')
+    parser.add_argument('--render', choices=RENDER_MODES, default=settings['RENDER_MODE'],
+                        help='auto: use Chrome only for pages that need JavaScript; static: never; browser: always')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Minify and dedupe the combined CSS/JS and write .gz/.br siblings')
+    parser.add_argument('--optimize-images', action='store_true',
+                        help='Re-encode images, add WebP and srcset variants (needs Pillow)')
+    parser.add_argument('--capture', action='store_true',
+                        help="Reuse the responses Chrome downloads while rendering instead of fetching assets again")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Report import, init and time-to-first-response times')
+    return parser.parse_args()
+
+def print_startup_profile(scraper, init_seconds):
+    stats = scraper.metrics.to_dict()
+    first_response = stats['first_response']
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f'''
+Startup profile:
+- Imports: {IMPORT_SECONDS:.3f}s
+- Scraper init: {init_seconds:.3f}s
+- First response: {f"{first_response:.3f}s after init" if first_response is not None else "none"}
+- Heavy modules loaded: {", ".join(loaded) or "none"}
+- Not loaded: {", ".join(name for name in HEAVY_MODULES if name not in loaded) or "none"}
+''')
 
 def main():
+    args = parse_args()
     try:
-        url = input("Enter website URL: ")
-        scraper = WebScraper(url)
+        url = args.url or input("Enter website URL: ")
+        if args.capture:
+            config.DEFAULT_CONFIG['BROWSER_CAPTURE'] = True
+        init_start = time.perf_counter()
+        scraper = WebScraper(url, render_mode=args.render, optimize_assets=args.optimize or None,
+                             optimize_images=args.optimize_images or None)
+        init_seconds = time.perf_counter() - init_start
+        
+        if args.crawl or args.resume:
+            print('Resuming website crawl...' if args.resume else 'Starting website crawl...')
+            crawler = Crawler(scraper, max_depth=args.max_depth, max_pages=args.max_pages, workers=args.workers,
+                              resume=args.resume)
+            result = crawler.crawl()
+            print(f'''
+Website crawled:
+- Pages cloned: {len(result["pages"])}
+- Pages failed: {len(result["failed"])}
+
+Files saved in: {scraper.base_dir}
+''')
+            return
         
         print('Starting website cloning...')
         data = scraper.clone_website()
@@ -16,6 +82,7 @@ Website cloned successfully:
 - Images: {len(data["images"])}
 - CSS files: {len(data["css_files"])}
 - JavaScript files: {len(data["js_files"])}
+- Fetches saved by HTTP cache: {data["fetches_saved"]}
 
 Files saved in: {scraper.base_dir}
 
@@ -24,14 +91,18 @@ Folder structure:
   ├── images/    (Downloaded images)
   ├── css/       (Stylesheet files)
   ├── js/        (JavaScript files)
+  ├── fonts/     (Web fonts referenced from CSS)
+  ├── data/      (Extracted records and metadata.json)
   └── index.html (Main HTML file)
 ''')
         
     except Exception as e:
         print(f"Error occurred: {str(e)}")
     finally:
+        if args.profile_startup and 'scraper' in locals():
+            print_startup_profile(scraper, init_seconds)
         if 'scraper' in locals():
-            del scraper
+            scraper.close()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the per-host latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+ASSET_TYPES = {
+    'text/html': 'html',
+    'text/css': 'css',
+    'image/': 'image',
+    'font/': 'font',
+    'application/font': 'font',
+    'application/x-font': 'font',
+    'fontobject': 'font',
+    'javascript': 'js',
+    'ecmascript': 'js'
+}
+
+
+def asset_type(content_type):
+    """Classify a response by its Content-Type into html/css/js/image/font/other"""
+    content_type = (content_type or '').lower()
+    for marker, name in ASSET_TYPES.items():
+        if marker in content_type:
+            return name
+    return 'other'
+
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus bucket layout"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def to_dict(self):
+        buckets = {str(bound): count for bound, count in zip(self.buckets, self.counts)}
+        buckets['+Inf'] = self.count
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'max': round(self.max, 6),
+            'buckets': buckets
+        }
+
+
+class Metrics:
+    """Thread-safe per-stage timings, per-asset-type traffic and per-host latency
+
+    Stage seconds are summed across threads, so with concurrent pages they
+    can add up to more than the wall time.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.first_response = None
+        self.stages = {}
+        self.assets = {}
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage):
+        """Time the enclosed block as one call of stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(stage, time.perf_counter() - start)
+
+    def record_time(self, stage, seconds):
+        with self.lock:
+            entry = self.stages.setdefault(stage, {'calls': 0, 'seconds': 0.0, 'max': 0.0})
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+
+    def record_asset(self, content_type, size=0, reused=False):
+        """Count a fetched (or reused, without a download) asset and its bytes"""
+        with self.lock:
+            entry = self.assets.setdefault(asset_type(content_type), {'requests': 0, 'bytes': 0, 'reused': 0})
+            if reused:
+                entry['reused'] += 1
+            else:
+                entry['requests'] += 1
+                entry['bytes'] += size
+
+    def observe_latency(self, host, seconds):
+        """Record the time a request to host took to return its response headers"""
+        with self.lock:
+            if self.first_response is None:
+                self.first_response = time.time()
+            histogram = self.hosts.get(host)
+            if histogram is None:
+                histogram = self.hosts[host] = Histogram()
+            histogram.observe(seconds)
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'started': self.started,
+                'elapsed': round(time.time() - self.started, 6),
+                'first_response': round(self.first_response - self.started, 6) if self.first_response else None,
+                'stages': {
+                    stage: {key: round(value, 6) for key, value in entry.items()}
+                    for stage, entry in self.stages.items()
+                },
+                'assets': {name: dict(entry) for name, entry in self.assets.items()},
+                'hosts': {host: histogram.to_dict() for host, histogram in self.hosts.items()}
+            }
+
+    def save(self, path):
+        """Write the stats as JSON, replacing the previous file atomically"""
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'  # Crawl threads may save at once
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def to_prometheus(self, prefix='scraper'):
+        """Render the stats in the Prometheus text exposition format"""
+        stats = self.to_dict()
+        lines = [
+            f'# TYPE {prefix}_stage_seconds_total counter',
+            *(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {entry["seconds"]}'
+              for stage, entry in stats['stages'].items()),
+            f'# TYPE {prefix}_stage_calls_total counter',
+            *(f'{prefix}_stage_calls_total{{stage="{stage}"}} {entry["calls"]}'
+              for stage, entry in stats['stages'].items()),
+            f'# TYPE {prefix}_asset_requests_total counter',
+            *(f'{prefix}_asset_requests_total{{type="{name}"}} {entry["requests"]}'
+              for name, entry in stats['assets'].items()),
+            f'# TYPE {prefix}_asset_bytes_total counter',
+            *(f'{prefix}_asset_bytes_total{{type="{name}"}} {entry["bytes"]}'
+              for name, entry in stats['assets'].items()),
+            f'# TYPE {prefix}_asset_reused_total counter',
+            *(f'{prefix}_asset_reused_total{{type="{name}"}} {entry["reused"]}'
+              for name, entry in stats['assets'].items()),
+            f'# TYPE {prefix}_request_latency_seconds histogram'
+        ]
+        for host, histogram in stats['hosts'].items():
+            for bound, count in histogram['buckets'].items():
+                lines.append(f'{prefix}_request_latency_seconds_bucket{{host="{host}",le="{bound}"}} {count}')
+            lines.append(f'{prefix}_request_latency_seconds_sum{{host="{host}"}} {histogram["sum"]}')
+            lines.append(f'{prefix}_request_latency_seconds_count{{host="{host}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def save_prometheus(self, path):
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
@@ -0,0 +1,115 @@
+import base64
+import json
+import logging
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# DevTools resource types whose bodies are kept for the clone
+CAPTURED_TYPES = {'Image', 'Stylesheet', 'Script', 'Font'}
+
+# Network.setBlockedURLs matches URL patterns, not resource types, so each
+# blockable type is approximated by its file extensions
+BLOCKED_EXTENSIONS = {
+    'media': ('mp4', 'webm', 'ogv', 'mov', 'm4v', 'mp3', 'ogg', 'wav', 'm4a', 'flac', 'm3u8', 'ts'),
+    'font': ('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'image': ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp')
+}
+
+
+class CapturedResponse:
+    __slots__ = ('url', 'status', 'resource_type', 'content_type', 'headers', 'body')
+
+    def __init__(self, url, status, resource_type, content_type, headers, body):
+        self.url = url
+        self.status = status
+        self.resource_type = resource_type
+        self.content_type = content_type
+        self.headers = headers
+        self.body = body
+
+
+def blocked_url_patterns(types=(), hosts=()):
+    """Build Network.setBlockedURLs patterns for resource types and (tracker) hosts"""
+    patterns = []
+    for resource_type in types:
+        for ext in BLOCKED_EXTENSIONS.get(resource_type, ()):
+            patterns.extend((f'*.{ext}', f'*.{ext}?*'))
+    for host in hosts:
+        patterns.extend((f'*://{host}/*', f'*://*.{host}/*'))
+    return patterns
+
+
+def start_capture(driver, blocked_patterns=()):
+    """Prepare a driver to record the next page's network traffic
+
+    Drops performance log entries left from earlier pages, and blocks
+    requests matching blocked_patterns until stop_capture is called.
+    """
+    driver.get_log('performance')
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(blocked_patterns)})
+
+
+def stop_capture(driver):
+    """Lift request blocking so the pooled driver is clean for the next page"""
+    try:
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+    except Exception as e:
+        logger.warning(f'Error clearing blocked URLs: {str(e)}')
+
+
+def read_network_events(entries):
+    """Pair responseReceived with loadingFinished events from performance log entries
+
+    Returns {request_id: response params} for requests whose bodies finished
+    loading. A later response for the same request (a redirect) replaces the
+    earlier one.
+    """
+    responses = {}
+    finished = set()
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.responseReceived':
+            responses[params.get('requestId')] = params
+        elif method == 'Network.loadingFinished':
+            finished.add(params.get('requestId'))
+    return {request_id: params for request_id, params in responses.items() if request_id in finished}
+
+
+def collect_responses(driver, types=CAPTURED_TYPES, max_bytes=None):
+    """Return CapturedResponse objects for the successful responses of the loaded page
+
+    Bodies are read with Network.getResponseBody, so this must run before
+    the driver navigates away. Responses of other types, non-200 responses
+    and bodies over max_bytes are skipped.
+    """
+    captured = []
+    for request_id, params in read_network_events(driver.get_log('performance')).items():
+        response = params.get('response', {})
+        url = response.get('url', '')
+        if params.get('type') not in types or response.get('status') != 200 \
+                or not url.startswith(('http://', 'https://')):
+            continue
+        try:
+            result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            logger.debug(f'No body captured for {url}: {str(e)}')
+            continue
+        headers = CaseInsensitiveDict(response.get('headers', {}))
+        content_type = headers.get('content-type') or response.get('mimeType', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(result['body'])
+        else:
+            # Text bodies arrive already decoded from the page's charset
+            body = result['body'].encode('utf-8')
+            content_type = f'{response.get("mimeType") or content_type.split(";")[0]}; charset=utf-8'
+        if max_bytes and len(body) > max_bytes:
+            continue
+        captured.append(CapturedResponse(url, response['status'], params['type'], content_type, headers, body))
+    return captured
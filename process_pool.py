@@ -0,0 +1,36 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+class ProcessPool:
+    """Lazily started process pool for CPU-bound stages (minifying, compressing, encoding images)
+
+    Processes are spawned on the first map() with more than one item, so a
+    stage that never has real work to share never pays for them.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def map(self, func, items):
+        """Run func over items and return the results in input order"""
+        items = list(items)
+        # Daemonic processes (batch pool workers) may not start children of their own
+        if len(items) < 2 or multiprocessing.current_process().daemon:
+            return [func(item) for item in items]
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+        return list(self.executor.map(func, items))
+
+    def close(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown()
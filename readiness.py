@@ -0,0 +1,96 @@
+import time
+
+# Installs a MutationObserver and a resource PerformanceObserver once per
+# document and reports when the DOM and the network last changed. Chrome's
+# resource timing buffer stops at 250 entries, so completed requests are
+# followed through the observer (and the buffer is enlarged for browsers
+# without one) rather than read back from the buffer.
+IDLE_PROBE_SCRIPT = """
+    var idle = window.__scraperIdle;
+    function track(entries) {
+        for (var i = 0; i < entries.length; i++) {
+            if (entries[i].responseEnd > idle.lastNetwork) idle.lastNetwork = entries[i].responseEnd;
+        }
+    }
+    if (!idle) {
+        idle = window.__scraperIdle = {lastChange: performance.now(), lastNetwork: 0, observed: false};
+        new MutationObserver(function () {
+            idle.lastChange = performance.now();
+        }).observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+        if (performance.setResourceTimingBufferSize) performance.setResourceTimingBufferSize(100000);
+        if (window.PerformanceObserver) {
+            try {
+                new PerformanceObserver(function (list) { track(list.getEntries()); })
+                    .observe({type: 'resource', buffered: true});
+                idle.observed = true;
+            } catch (e) {}
+        }
+    }
+    if (!idle.observed) track(performance.getEntriesByType('resource'));
+    return {
+        now: performance.now(),
+        lastChange: idle.lastChange,
+        lastNetwork: idle.lastNetwork,
+        ready: document.readyState
+    };
+"""
+
+SCROLL_STEP_SCRIPT = """
+    var root = document.scrollingElement || document.documentElement;
+    window.scrollBy(0, window.innerHeight);
+    return {
+        bottom: window.scrollY + window.innerHeight,
+        height: Math.max(root.scrollHeight, document.body ? document.body.scrollHeight : 0)
+    };
+"""
+
+PAGE_HEIGHT_SCRIPT = """
+    var root = document.scrollingElement || document.documentElement;
+    return Math.max(root.scrollHeight, document.body ? document.body.scrollHeight : 0);
+"""
+
+
+def wait_until_stable(driver, quiet_window=0.5, timeout=10):
+    """Wait until the DOM and network have been quiet for quiet_window seconds
+
+    The network signal is the end time of the latest completed request.
+    Requests still in flight are not visible to the page, so one that
+    takes longer than quiet_window without changing the DOM does not hold
+    the wait open; timeout bounds the wait either way.
+
+    Returns (seconds waited, whether the page became stable before timeout).
+    """
+    start = time.monotonic()
+    while True:
+        state = driver.execute_script(IDLE_PROBE_SCRIPT)
+        idle_for = (state['now'] - max(state['lastChange'], state['lastNetwork'])) / 1000
+        elapsed = time.monotonic() - start
+        if state['ready'] == 'complete' and idle_for >= quiet_window:
+            return elapsed, True
+        if elapsed >= timeout:
+            return elapsed, False
+        # Sleep until the quiet window could have elapsed at the earliest
+        time.sleep(min(max(quiet_window - idle_for, 0.05), timeout - elapsed))
+
+
+def scroll_to_bottom(driver, quiet_window=0.3, timeout=30, max_steps=50):
+    """Scroll one viewport at a time until the page stops growing
+
+    Returns (seconds spent, number of scroll steps).
+    """
+    start = time.monotonic()
+    steps = 0
+    while steps < max_steps:
+        position = driver.execute_script(SCROLL_STEP_SCRIPT)
+        steps += 1
+
+        remaining = timeout - (time.monotonic() - start)
+        if remaining <= 0:
+            break
+        wait_until_stable(driver, quiet_window, remaining)
+
+        # At the bottom and nothing new was loaded: done
+        if position['bottom'] >= position['height'] and \
+                driver.execute_script(PAGE_HEIGHT_SCRIPT) <= position['height']:
+            break
+    return time.monotonic() - start, steps
@@ -0,0 +1,251 @@
+import codecs
+import csv
+import glob
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+RECORD_FORMATS = ('csv', 'jsonl', 'parquet')
+FORMAT_ALIASES = {'json': 'jsonl'}
+EXTENSIONS = {'csv': '.csv', 'jsonl': '.jsonl', 'parquet': '.parquet'}
+
+# Columns of each record table, with their Parquet types. Every row also
+# names the page it was extracted from, so tables from a crawl can be
+# filtered or grouped by page.
+RECORD_TABLES = {
+    'headers': (('page', 'string'), ('position', 'int64'), ('text', 'string')),
+    'paragraphs': (('page', 'string'), ('position', 'int64'), ('text', 'string')),
+    'links': (('page', 'string'), ('position', 'int64'), ('url', 'string')),
+    'images': (
+        ('page', 'string'), ('filename', 'string'), ('original_url', 'string'), ('content_type', 'string'),
+        ('size', 'int64'), ('sha256', 'string'), ('width', 'int64'), ('height', 'int64'), ('variants', 'string')
+    )
+}
+
+PARQUET_ROW_GROUP_SIZE = 10000
+
+
+def resolve_format(name):
+    """Return the record format for an OUTPUT_FORMAT value
+
+    Parquet falls back to JSON Lines with a warning when pyarrow is missing.
+    """
+    name = FORMAT_ALIASES.get(name, name)
+    if name not in RECORD_FORMATS:
+        raise ValueError(f'Unknown output format {name!r}, expected one of {", ".join(RECORD_FORMATS)}')
+    if name == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logger.warning('pyarrow is not installed, writing JSON Lines instead of Parquet')
+            return 'jsonl'
+    return name
+
+
+def flat_value(value):
+    """Columns hold scalars; lists and dicts (image variants) are stored as JSON text"""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class JsonLinesTable:
+    def __init__(self, path, columns, append=False):
+        self.columns = [name for name, _ in columns]
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, rows):
+        self.file.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+        self.file.flush()
+
+    def checkpoint(self):
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class CsvTable:
+    def __init__(self, path, columns, append=False, encoding='utf-8'):
+        self.columns = [name for name, _ in columns]
+        has_rows = append and os.path.exists(path) and os.path.getsize(path) > 0
+        if has_rows and codecs.lookup(encoding).name == 'utf-8-sig':
+            # The byte order mark belongs at the start of the file only
+            encoding = 'utf-8'
+        self.file = open(path, 'a' if append else 'w', encoding=encoding, newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=self.columns)
+        if not has_rows:
+            self.writer.writeheader()
+
+    def write(self, rows):
+        self.writer.writerows({name: flat_value(value) for name, value in row.items()} for row in rows)
+        self.file.flush()
+
+    def checkpoint(self):
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetTable:
+    """A Parquet dataset directory of part files
+
+    A Parquet file is only readable once its footer is written, so rows
+    are not held until the end of the run: each checkpoint() writes the
+    buffered rows and closes the current part, and the next rows start a
+    new one. Between checkpoints rows are written as row groups of
+    row_group_size. Appending keeps the readable parts of earlier runs
+    (dropping any left without a footer by a crash); otherwise earlier
+    parts are removed.
+    """
+
+    def __init__(self, path, columns, append=False, row_group_size=PARQUET_ROW_GROUP_SIZE):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.pq = pq
+        self.directory = path
+        self.schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in columns])
+        self.row_group_size = row_group_size
+        self.rows = []
+        self.writer = None
+
+        os.makedirs(path, exist_ok=True)
+        self.next_part = 0
+        for part in sorted(glob.glob(os.path.join(path, 'part-*.parquet'))):
+            if append and self.readable(part):
+                self.next_part = max(self.next_part, int(os.path.basename(part)[5:-8]) + 1)
+                continue
+            if append:
+                logger.warning(f'Removing unreadable Parquet part {part}')
+            os.remove(part)
+
+    def readable(self, part):
+        try:
+            self.pq.ParquetFile(part)
+            return True
+        except Exception:
+            return False
+
+    def write(self, rows):
+        self.rows.extend({name: flat_value(value) for name, value in row.items()} for row in rows)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        if self.writer is None:
+            path = os.path.join(self.directory, f'part-{self.next_part:04d}.parquet')
+            self.next_part += 1
+            self.writer = self.pq.ParquetWriter(path, self.schema)
+        self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+        self.rows = []
+
+    def checkpoint(self):
+        self.flush()
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    def close(self):
+        self.checkpoint()
+
+
+class RecordWriter:
+    """Append-only writer for the records extracted from each page
+
+    Headers, paragraphs, links and images each go to their own table in
+    directory (headers.csv, links.jsonl, images.parquet/, ...). CSV and
+    JSON Lines rows are written as each page completes; Parquet rows at
+    each checkpoint(), so nothing accumulates in memory over a crawl.
+    Safe to share between crawl threads.
+    """
+
+    def __init__(self, directory, output_format='csv', encoding='utf-8', append=False):
+        self.directory = directory
+        self.format = resolve_format(output_format)
+        self.encoding = encoding
+        self.append = append
+        self.tables = {}
+        self.counts = {kind: 0 for kind in RECORD_TABLES}
+        self.pages = 0
+        self.lock = threading.Lock()
+
+    def path(self, kind):
+        return os.path.join(self.directory, kind + EXTENSIONS[self.format])
+
+    def table(self, kind):
+        # Tables are opened on their first rows
+        if kind not in self.tables:
+            os.makedirs(self.directory, exist_ok=True)
+            columns = RECORD_TABLES[kind]
+            if self.format == 'parquet':
+                self.tables[kind] = ParquetTable(self.path(kind), columns, self.append)
+            elif self.format == 'csv':
+                self.tables[kind] = CsvTable(self.path(kind), columns, self.append, self.encoding)
+            else:
+                self.tables[kind] = JsonLinesTable(self.path(kind), columns, self.append)
+        return self.tables[kind]
+
+    def write(self, kind, rows):
+        if rows:
+            self.table(kind).write(rows)
+            self.counts[kind] += len(rows)
+
+    def write_page(self, page_url, data):
+        """Write the headers, paragraphs, links and images extracted from one page"""
+        with self.lock:
+            for kind, field in (('headers', 'text'), ('paragraphs', 'text'), ('links', 'url')):
+                self.write(kind, [
+                    {'page': page_url, 'position': position, field: value}
+                    for position, value in enumerate(data.get(kind, []))
+                ])
+            columns = [name for name, _ in RECORD_TABLES['images']]
+            self.write('images', [
+                {name: page_url if name == 'page' else image.get(name) for name in columns}
+                for image in data.get('images', [])
+            ])
+            self.pages += 1
+
+    def checkpoint(self):
+        """Make every row written so far durable and readable, e.g. before the crawl journal is synced"""
+        with self.lock:
+            for table in self.tables.values():
+                table.checkpoint()
+
+    def files(self):
+        """Record files written so far, relative to directory"""
+        return {kind: os.path.basename(self.path(kind)) for kind in self.tables}
+
+    def close(self):
+        with self.lock:
+            for kind, table in self.tables.items():
+                try:
+                    table.close()
+                except Exception as e:
+                    logger.error(f'Error closing {self.path(kind)}: {str(e)}')
+
+
+def iter_records(path, encoding='utf-8-sig', batch_size=PARQUET_ROW_GROUP_SIZE):
+    """Yield the rows of a record table one at a time, without loading the whole table
+
+    The format is taken from the extension. CSV values are read back as
+    strings; utf-8-sig also reads files written without a byte order mark.
+    """
+    if path.endswith('.parquet'):
+        import pyarrow.dataset as ds
+        for batch in ds.dataset(path, format='parquet').to_batches(batch_size=batch_size):
+            yield from batch.to_pylist()
+    elif path.endswith('.csv'):
+        with open(path, 'r', encoding=encoding, newline='') as f:
+            yield from csv.DictReader(f)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -0,0 +1,122 @@
+import posixpath
+import re
+import threading
+from urllib.parse import quote, urljoin, urlparse
+from css_rewriter import format_reference, rewrite_css, scan_css
+from urls import normalize_url
+
+# Attributes holding a single URL, per tag
+URL_ATTRIBUTES = {
+    'img': ('src', 'data-src', 'data-original'),
+    'source': ('src',),
+    'link': ('href',),
+    'script': ('src',),
+    'video': ('poster',),
+    'input': ('src',)
+}
+
+# Attributes holding a srcset candidate list, per tag
+SRCSET_ATTRIBUTES = {
+    'img': ('srcset', 'data-srcset'),
+    'source': ('srcset', 'data-srcset')
+}
+
+SRCSET_CANDIDATE = re.compile(r'\s*([^\s,][^\s]*?)(,?)(?=\s|$)([^,]*),?')
+
+
+def parse_srcset(value):
+    """Split a srcset into (url, descriptor) pairs
+
+    URLs may themselves contain commas (data: URIs); as in the HTML spec a
+    URL runs to the next whitespace, and only a trailing comma ends it.
+    """
+    candidates = []
+    for match in SRCSET_CANDIDATE.finditer(value):
+        url, ended, descriptor = match.groups()
+        candidates.append((url, '' if ended else descriptor.strip()))
+    return candidates
+
+
+class ResourceMap:
+    """Site-wide map from asset URLs to the local files they were saved as
+
+    Filled in as assets are fetched. Keys are normalized URLs, so a lookup
+    is one dictionary access whatever form the reference takes in the page.
+    Local paths are relative to the site directory, with / separators.
+    """
+
+    def __init__(self):
+        self.paths = {}
+        self.lock = threading.Lock()
+
+    def add(self, url, local_path):
+        with self.lock:
+            self.paths[normalize_url(url)] = local_path.replace('\\', '/')
+
+    def lookup(self, url):
+        return self.paths.get(normalize_url(url))
+
+    def resolve(self, reference, page_url, page_dir=''):
+        """Return the local path for a reference found on page_url, relative to page_dir, or None"""
+        reference = reference.strip()
+        if not reference or reference.startswith(('data:', 'javascript:', 'mailto:', 'tel:', '#')):
+            return None
+        absolute = urljoin(page_url, reference)
+        if urlparse(absolute).scheme not in ('http', 'https'):
+            return None
+        local_path = self.paths.get(normalize_url(absolute))
+        if local_path is None:
+            return None
+        # Saved file names can contain characters like % that must be escaped in a URL
+        return quote(posixpath.relpath(local_path, page_dir or '.'), safe="/!$&'()*+,;=:@~")
+
+    def rewrite_srcset(self, value, page_url, page_dir):
+        candidates = parse_srcset(value)
+        rewritten = [(self.resolve(url, page_url, page_dir) or url, descriptor) for url, descriptor in candidates]
+        if rewritten == candidates:
+            return value
+        return ', '.join(f'{url} {descriptor}' if descriptor else url for url, descriptor in rewritten)
+
+    def rewrite_css(self, css, page_url, page_dir):
+        edits = []
+        for ref in scan_css(css):
+            local_path = self.resolve(ref.url, page_url, page_dir)
+            if local_path:
+                edits.append((ref, format_reference(ref, local_path)))
+        return rewrite_css(css, edits) if edits else css
+
+    def rewrite(self, soup, page_url, page_dir=''):
+        """Point every mapped reference in the document at its local copy, in one pass
+
+        Covers img/source src and srcset, link href, script src, inline
+        style attributes and <style> blocks. page_dir is the page's
+        directory relative to the site directory. Returns the number of
+        references rewritten.
+        """
+        count = 0
+        for tag in soup.find_all(True):
+            for attr in URL_ATTRIBUTES.get(tag.name, ()):
+                value = tag.get(attr)
+                local_path = self.resolve(value, page_url, page_dir) if isinstance(value, str) else None
+                if local_path:
+                    tag[attr] = local_path
+                    count += 1
+            for attr in SRCSET_ATTRIBUTES.get(tag.name, ()):
+                value = tag.get(attr)
+                if value:
+                    rewritten = self.rewrite_srcset(value, page_url, page_dir)
+                    if rewritten != value:
+                        tag[attr] = rewritten
+                        count += 1
+            style = tag.get('style')
+            if style and 'url(' in style.lower():
+                rewritten = self.rewrite_css(style, page_url, page_dir)
+                if rewritten != style:
+                    tag['style'] = rewritten
+                    count += 1
+            if tag.name == 'style' and tag.string and 'url(' in tag.string.lower():
+                rewritten = self.rewrite_css(tag.string, page_url, page_dir)
+                if rewritten != tag.string:
+                    tag.string = rewritten
+                    count += 1
+        return count
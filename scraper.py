@@ -1,24 +1,98 @@
 import requests
-from bs4 import BeautifulSoup
 import os
 import time
+import codecs
+import shutil
 import re
 import config
-from urllib.parse import urljoin, urlparse
+from urllib.parse import quote, urljoin, urlparse, urldefrag
 import json
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import logging
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 import json
+from downloader import DownloadEngine, DownloadLimitError
+from transport import create_session
+from metrics import Metrics
+from network_capture import blocked_url_patterns, collect_responses, start_capture, stop_capture
+from asset_store import AssetStore
+from http_cache import ValidatorCache
+from resource_map import ResourceMap, parse_srcset
+from urls import normalize_url, url_to_path
+from fetch_strategy import needs_javascript
+from html_document import resolve_parser, decode_html, document_body, document_head, parse_html, write_html
+from driver_pool import get_default_pool
+from snapshot import PageSnapshot
+from readiness import wait_until_stable, scroll_to_bottom
+from text_extraction import extract_text
+from asset_pipeline import AssetPipeline
+from image_optimizer import ImageOptimizer
+from record_writer import RecordWriter
+from css_rewriter import FONT_EXTENSIONS, scan_css, rewrite_css, format_reference, wrap_import, rebase_css_urls
+
+# Finds every image URL on a rendered page in a single WebDriver round trip:
+# src/data-src/data-original/srcset/data-bg attributes, inline background-image
+# styles and computed backgrounds, deduplicated in the browser
+IMAGE_DISCOVERY_SCRIPT = """
+    var selectors = [
+        'img[src]', 'img[data-src]', 'img[data-original]',
+        'div[style*="background-image"]', 'div[data-bg]',
+        'picture source[srcset]'
+    ];
+    var attrs = ['src', 'data-src', 'data-original', 'srcset', 'data-bg'];
+    var urlPattern = /url\\(["']?(.*?)["']?\\)/g;
+    var seen = {};
+    var images = [];
+
+    function add(url) {
+        if (!Object.prototype.hasOwnProperty.call(seen, url)) {
+            seen[url] = true;
+            images.push(url);
+        }
+    }
+    function addCssUrls(value) {
+        var match;
+        urlPattern.lastIndex = 0;
+        while ((match = urlPattern.exec(value)) !== null) add(match[1]);
+    }
+
+    for (var s = 0; s < selectors.length; s++) {
+        var elements = document.querySelectorAll(selectors[s]);
+        for (var i = 0; i < elements.length; i++) {
+            var element = elements[i];
+            for (var a = 0; a < attrs.length; a++) {
+                // Like WebElement.get_attribute, prefer the resolved src property
+                var value = attrs[a] === 'src' && typeof element.src === 'string'
+                    ? element.src : element.getAttribute(attrs[a]);
+                if (!value) continue;
+                if (value.indexOf(',') !== -1) {  // Handle srcset
+                    var parts = value.split(',');
+                    for (var p = 0; p < parts.length; p++) add(parts[p].trim().split(' ')[0]);
+                } else {
+                    add(value);
+                }
+            }
+            var style = element.getAttribute('style');
+            if (style && style.indexOf('background-image') !== -1) addCssUrls(style);
+        }
+    }
+
+    var all = document.getElementsByTagName('*');
+    for (var j = 0; j < all.length; j++) {
+        var bg = window.getComputedStyle(all[j], null).backgroundImage;
+        if (bg && bg !== 'none') addCssUrls(bg);
+    }
+    return images;
+"""
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
 
 class WebScraper:
-    def __init__(self, base_url):
+    def __init__(self, base_url, render_mode=None, driver_pool=None, global_limits=None, optimize_assets=None,
+                 optimize_images=None):
+        settings = config.DEFAULT_CONFIG
         self.base_url = base_url
         self.domain = urlparse(base_url).netloc
         
@@ -30,70 +104,326 @@ class WebScraper:
         self.data_dir = os.path.join(self.base_dir, 'data')
         self.css_dir = os.path.join(self.base_dir, 'css')
         self.js_dir = os.path.join(self.base_dir, 'js')
+        self.fonts_dir = os.path.join(self.base_dir, 'fonts')
+        
+        # Subdirectories are created when the first file is written to them,
+        # so a run that fails early leaves only its log behind
+        os.makedirs(self.base_dir, exist_ok=True)
+        
+        # Set up logging: console through the root logger, and a log file per site.
+        # basicConfig only takes effect once per process, so the file handler
+        # belongs to this site's own logger rather than the root logger.
+        logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, handlers=[logging.StreamHandler()])
+        self.logger = logging.getLogger(f'{__name__}.{self.domain.replace(".", "_")}')
+        self.log_handler = None
+        log_file = os.path.abspath(os.path.join(self.base_dir, 'scraping.log'))
+        if not any(getattr(handler, 'baseFilename', None) == log_file for handler in self.logger.handlers):
+            self.log_handler = logging.FileHandler(log_file, encoding='utf-8')
+            self.log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            self.logger.addHandler(self.log_handler)
         
-        # Create directories
-        for directory in [self.images_dir, self.data_dir, self.css_dir, self.js_dir]:
-            os.makedirs(directory, exist_ok=True)
-        
-        # Set up logging
-        log_file = os.path.join(self.base_dir, 'scraping.log')
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
+        # Every page is parsed once, with the fastest installed parser
+        self.parser = resolve_parser(settings['HTML_PARSER'])
+        
+        # Drivers are borrowed from a shared pool, only for pages that need JavaScript rendering
+        self.render_mode = render_mode or settings['RENDER_MODE']
+        self.driver_pool = driver_pool
+        self._local = threading.local()
+        
+        # Optionally keep what Chrome downloads while rendering, so assets are not fetched twice.
+        # Chrome must be started with its performance log on, so this is a process-wide setting.
+        self.capture_network = settings['BROWSER_CAPTURE']
+        self.blocked_urls = blocked_url_patterns(settings['BROWSER_BLOCK'], settings['BROWSER_BLOCK_HOSTS'])
+        
+        # Set up HTTP session with pooled keep-alive connections, retries and default timeouts
+        self.session = create_session(
+            backend=settings['TRANSPORT'],
+            pool_size=settings['MAX_CONNECTIONS_PER_HOST'],
+            retries=settings['MAX_RETRIES'],
+            backoff=settings['REQUEST_DELAY'],
+            timeout=(settings['CONNECT_TIMEOUT'], settings['READ_TIMEOUT']),
+            headers={
+                'User-Agent': settings['USER_AGENT'],
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
+            }
         )
-        self.logger = logging.getLogger(__name__)
-        
-        # Set up Selenium
-        chrome_options = Options()
-        chrome_options.add_argument('--headless=new')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 10)
-        
-        # Set up requests session
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-        })
+        
+        # Per-stage timings and traffic, saved to stats.json next to metadata.json
+        self.metrics = Metrics()
+        
+        # Set up concurrent download engine
+        self.downloader = DownloadEngine(
+            self.session,
+            workers=settings['DOWNLOAD_WORKERS'],
+            per_host=settings['MAX_CONNECTIONS_PER_HOST'],
+            rate=settings['REQUESTS_PER_SECOND'],
+            burst=settings['REQUEST_BURST'],
+            max_file_bytes=settings['MAX_ASSET_BYTES'],
+            max_run_bytes=settings['MAX_RUN_BYTES'],
+            chunk_size=settings['DOWNLOAD_CHUNK_SIZE'],
+            metrics=self.metrics,
+            global_limits=global_limits
+        )
+        self.resume_downloads = settings['RESUME_DOWNLOADS']
+        
+        # Content-addressed asset store shared across pages and runs
+        self.store = AssetStore(settings['ASSET_STORE_DIR'])
+        
+        # HTTP validators for conditional re-fetches, kept next to metadata.json
+        self.http_cache = ValidatorCache(os.path.join(self.data_dir, 'http_cache.json'))
+        self.fetched_urls = set()
+        # Set while a Crawler drives this scraper; its checkpoints save the cache instead
+        self.crawling = False
+        
+        # Where each fetched asset was saved, for pointing pages at their local copies
+        self.resources = ResourceMap()
+        
+        # Extracted records are streamed to data/ as each page completes (opened on first use)
+        self.records = None
+        self.records_lock = threading.Lock()
+        
+        # Optional minify/dedupe/precompress stage for the combined bundles
+        optimize_assets = settings['ASSET_PIPELINE'] if optimize_assets is None else optimize_assets
+        self.pipeline = AssetPipeline(
+            minify=settings['ASSET_MINIFY'],
+            compress=settings['ASSET_COMPRESS'],
+            workers=settings['ASSET_PIPELINE_WORKERS']
+        ) if optimize_assets else None
+        
+        # Optional re-encoding of downloaded images into srcset variants
+        optimize_images = settings['IMAGE_OPTIMIZE'] if optimize_images is None else optimize_images
+        self.image_optimizer = ImageOptimizer(
+            self.store,
+            quality=settings['IMAGE_QUALITY'],
+            formats=settings['IMAGE_FORMATS'],
+            widths=settings['IMAGE_SRCSET_WIDTHS'],
+            strip_metadata=settings['IMAGE_STRIP_METADATA'],
+            workers=settings['IMAGE_WORKERS']
+        ) if optimize_images else None
 
     def __del__(self):
-        if hasattr(self, 'driver'):
-            self.driver.quit()
+        if hasattr(self, 'downloader'):
+            self.downloader.shutdown(wait=False)
+
+    def close(self):
+        """Finish the record files and release this scraper's download threads, connections and log file"""
+        self.close_records()
+        self.downloader.shutdown()
+        self.session.close()
+        if self.pipeline:
+            self.pipeline.close()
+        if self.image_optimizer:
+            self.image_optimizer.close()
+        if self.log_handler:
+            self.logger.removeHandler(self.log_handler)
+            self.log_handler.close()
+            self.log_handler = None
+
+    @property
+    def driver(self):
+        """The driver borrowed by the current thread"""
+        driver = getattr(self._local, 'driver', None)
+        if driver is None:
+            raise RuntimeError('No driver borrowed; use borrow_driver()')
+        return driver
+
+    @property
+    def wait(self):
+        from selenium.webdriver.support.ui import WebDriverWait
+        return WebDriverWait(self.driver, 10)
+
+    @contextmanager
+    def borrow_driver(self):
+        """Borrow a driver from the pool for the current thread"""
+        if self.driver_pool is None:
+            self.driver_pool = get_default_pool()
+        with self.driver_pool.driver() as driver:
+            self._local.driver = driver
+            try:
+                yield driver
+            finally:
+                self._local.driver = None
+
+    def fetch_static_page(self, url):
+        """Fetch and parse page HTML without a browser, or return None if it must be rendered
+
+        Returns a (final url, html, soup) triple; the soup is the page's only
+        parse, and relative links resolve against the final (redirected) URL.
+        """
+        if self.render_mode == 'browser':
+            return None
+        try:
+            with self.metrics.span('fetch'), self.downloader.request(url) as response:
+                response.raise_for_status()
+                final_url = response.url
+                content = response.content
+                content_type = response.headers.get('content-type', 'text/html')
+                self.metrics.record_asset(content_type, len(content))
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            # Only a failed connection is worth retrying in Chrome; an HTTP error
+            # status (404, 410, ...) would be the same there
+            if self.render_mode == 'static':
+                raise
+            self.logger.warning(f'Static fetch failed, falling back to browser: {url} ({str(e)})')
+            return None
+        html = decode_html(content, content_type)
+        
+        with self.metrics.span('parse'):
+            soup = parse_html(html, self.parser)
+        if self.render_mode == 'auto':
+            reason = needs_javascript(html, soup)
+            if reason:
+                self.logger.info(f'Rendering with browser ({reason}): {url}')
+                return None
+        return final_url, html, soup
+
+    def take_snapshot(self, url):
+        """Load a page once, rendering it in Chrome only when needed"""
+        self.logger.info(f'Loading page: {url}')
+        page = self.fetch_static_page(url)
+        if page is not None:
+            final_url, html, soup = page
+            return PageSnapshot(final_url, html, soup, self.get_static_image_urls(soup))
+        
+        with self.borrow_driver():
+            capturing = self.capture_network and self.start_network_capture()
+            try:
+                self.driver.set_page_load_timeout(30)
+                with self.metrics.span('render'):
+                    self.driver.get(url)
+                timings = {
+                    'wait': self.wait_for_page_load(),
+                    'scroll': self.scroll_page()
+                }
+                for stage, seconds in timings.items():
+                    self.metrics.record_time(stage, seconds)
+                
+                final_url = self.driver.current_url
+                html = self.driver.page_source
+                with self.metrics.span('parse'):
+                    soup = parse_html(html, self.parser)
+                image_urls = self.get_image_urls(soup)
+                
+                if capturing:
+                    with self.metrics.span('capture'):
+                        self.store_captured_responses()
+            finally:
+                if capturing:
+                    stop_capture(self.driver)
+        return PageSnapshot(final_url, html, soup, image_urls, rendered=True, timings=timings)
+
+    def start_network_capture(self):
+        """Start recording the borrowed driver's responses, returning False if it cannot"""
+        try:
+            start_capture(self.driver, self.blocked_urls)
+            return True
+        except Exception as e:
+            # Drivers started before BROWSER_CAPTURE was enabled have no performance log
+            self.logger.warning(f'Network capture unavailable, fetching assets separately: {str(e)}')
+            return False
+
+    def store_captured_responses(self):
+        """Put the bodies Chrome downloaded into the asset store
 
-    def save_metadata(self, data):
-        """Save metadata to JSON file"""
+        fetch_asset then serves these URLs from the store, so only assets
+        the browser did not load are requested again.
+        """
+        try:
+            responses = collect_responses(self.driver, max_bytes=self.downloader.max_file_bytes)
+        except Exception as e:
+            self.logger.warning(f'Error reading captured responses: {str(e)}')
+            return
+        
+        stored = 0
+        for response in responses:
+            if response.url in self.fetched_urls:
+                continue
+            record = self.store.put_bytes(response.url, response.body, response.content_type)
+            self.http_cache.update(response.url, response.headers)
+            self.metrics.record_asset(response.content_type, record['size'])
+            self.fetched_urls.add(response.url)
+            stored += 1
+        self.logger.info(f'Captured {stored} responses from the browser')
+
+    def open_records(self, append=False):
+        """Return the record writer, opening it on first use
+
+        With append, rows are added to the record files of an earlier run
+        (a resumed crawl) instead of replacing them.
+        """
+        with self.records_lock:
+            if self.records is None:
+                settings = config.DEFAULT_CONFIG
+                self.records = RecordWriter(self.data_dir, settings['OUTPUT_FORMAT'], settings['ENCODING'], append)
+            return self.records
+
+    def checkpoint_records(self):
+        """Make the records written so far durable (and, for Parquet, readable)"""
+        with self.records_lock:
+            records = self.records
+        if records is not None:
+            records.checkpoint()
+
+    def close_records(self):
+        """Finish the record files and save the metadata.json summary"""
+        with self.records_lock:
+            records, self.records = self.records, None
+        if records is None:
+            return
+        records.close()
+        try:
+            self.save_metadata(records)
+        except Exception as e:
+            self.logger.error(f'Error saving metadata: {str(e)}')
+
+    def save_metadata(self, records):
+        """Save a summary of the run and its record files to metadata.json"""
         metadata = {
             'url': self.base_url,
             'domain': self.domain,
             'scrape_date': datetime.now().isoformat(),
+            'format': records.format,
             'stats': {
-                'images_count': len(data.get('images', [])),
-                'headers_count': len(data.get('headers', [])),
-                'paragraphs_count': len(data.get('paragraphs', [])),
-                'links_count': len(data.get('links', [])),
+                'pages_count': records.pages,
+                'images_count': records.counts['images'],
+                'headers_count': records.counts['headers'],
+                'paragraphs_count': records.counts['paragraphs'],
+                'links_count': records.counts['links'],
             },
-            'data': data
+            'records': records.files()
         }
         
+        os.makedirs(self.data_dir, exist_ok=True)
         metadata_file = os.path.join(self.data_dir, 'metadata.json')
+        # Appended records add to the counts of the run they continue
+        if records.append and os.path.exists(metadata_file):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    previous = json.load(f)
+                for key, count in previous.get('stats', {}).items():
+                    metadata['stats'][key] = metadata['stats'].get(key, 0) + count
+                metadata['records'] = dict(previous.get('records', {}), **metadata['records'])
+            except (OSError, ValueError, TypeError) as e:
+                self.logger.warning(f'Could not read previous metadata: {str(e)}')
         with open(metadata_file, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
         
         self.logger.info(f'Metadata saved to: {metadata_file}')
 
+    def save_stats(self):
+        """Save timings and traffic stats next to metadata.json"""
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            self.metrics.save(os.path.join(self.data_dir, 'stats.json'))
+            if config.DEFAULT_CONFIG['METRICS_EXPORT'] == 'prometheus':
+                self.metrics.save_prometheus(os.path.join(self.data_dir, 'stats.prom'))
+        except Exception as e:
+            self.logger.error(f'Error saving stats: {str(e)}')
+
     def save_text_content(self, data):
         """Save text content to separate files"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        
         # Save headers
         headers_file = os.path.join(self.data_dir, 'headers.txt')
         with open(headers_file, 'w', encoding='utf-8') as f:
@@ -115,67 +445,32 @@ class WebScraper:
                 if link and not link.isspace():
                     f.write(f'{link}\n')
 
-    def download_images(self):
+    def download_images(self, snapshot=None):
         """Download and save images to the designated folder"""
-        self.logger.info('Loading page...')
         try:
-            self.driver.set_page_load_timeout(30)
-            self.driver.get(self.base_url)
-            self.wait_for_page_load()
-            self.scroll_page()
-            
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            image_urls = self.get_image_urls(soup)
+            snapshot = snapshot or self.take_snapshot(self.base_url)
+            url = snapshot.url
+            image_urls = snapshot.image_urls
             
             if not image_urls:
                 self.logger.warning("No images found on the page")
                 return []
                 
             self.logger.info(f'Found {len(image_urls)} images')
-            downloaded_images = []
             
+            targets = []
             for img_url in image_urls:
                 if not img_url or img_url.startswith('data:'):
                     continue
                     
                 if not img_url.startswith(('http://', 'https://')):
-                    img_url = urljoin(self.base_url, img_url)
-
-                try:
-                    response = self.session.get(img_url, timeout=10, stream=True)
-                    response.raise_for_status()
-                    
-                    content_type = response.headers.get('content-type', '')
-                    if not content_type.startswith('image/'):
-                        self.logger.warning(f'Skipping non-image URL: {img_url} (type: {content_type})')
-                        continue
-                    
-                    filename = self.sanitize_filename(os.path.basename(urlparse(img_url).path))
-                    if not filename or filename == '.':
-                        filename = f'image_{len(downloaded_images) + 1}{os.path.splitext(filename)[1] or ".jpg"}'
-                        
-                    full_path = os.path.join(self.images_dir, filename)
-                    
-                    with open(full_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                    
-                    image_info = {
-                        'filename': filename,
-                        'original_url': img_url,
-                        'content_type': content_type,
-                        'size': os.path.getsize(full_path)
-                    }
-                    downloaded_images.append(image_info)
-                    
-                    self.logger.info(f'Saved: {filename}')
-                    time.sleep(0.5)
-                    
-                except requests.exceptions.RequestException as e:
-                    self.logger.error(f'Failed to download {img_url}: {str(e)}')
-                except Exception as e:
-                    self.logger.error(f'Unexpected error downloading {img_url}: {str(e)}')
+                    img_url = urljoin(url, img_url)
+                targets.append(img_url)
+            # Different relative spellings (../img/a.png, /img/a.png) resolve to one image
+            targets = list(dict.fromkeys(targets))
+            
+            results = self.downloader.map(self.download_image, enumerate(targets, 1))
+            downloaded_images = [image_info for image_info in results if image_info]
             
             self.logger.info(f'Successfully downloaded {len(downloaded_images)} images')
             return downloaded_images
@@ -184,25 +479,146 @@ class WebScraper:
             self.logger.error(f'Error processing page: {str(e)}')
             return []
 
-    def scrape(self):
-        """Extract all data from the website"""
+    def fetch_asset(self, url, accept=None):
+        """Return the asset store record for a URL, downloading only if it changed
+
+        Bodies are streamed to disk in chunks within the per-file and per-run
+        byte limits, and an interrupted download resumes with a Range request.
+        """
+        record = self.store.lookup(url)
+        if record and url in self.fetched_urls:
+            self.logger.info(f'Reusing stored asset: {url}')
+            self.metrics.record_asset(record['content_type'], reused=True)
+        elif record and self.http_cache.is_fresh(url):
+            self.http_cache.note_fresh()
+            self.metrics.record_asset(record['content_type'], reused=True)
+            self.logger.info(f'Reusing fresh cached asset: {url}')
+        else:
+            headers = self.http_cache.conditional_headers(url) if record else {}
+            partial, offset, validator = (None, 0, None)
+            if not record and self.resume_downloads:
+                partial, offset, validator = self.store.claim_partial(url)
+                if offset:
+                    # Partial files hold decoded bytes, so the range must be of the unencoded body
+                    headers = {'Range': f'bytes={offset}-', 'If-Range': validator, 'Accept-Encoding': 'identity'}
+            
+            try:
+                with self.downloader.request(url, stream=True, headers=headers) as response:
+                    if record and response.status_code == 304:
+                        self.http_cache.update(url, response.headers, not_modified=True)
+                        self.metrics.record_asset(record['content_type'], reused=True)
+                        self.logger.info(f'Not modified, reusing stored asset: {url}')
+                    else:
+                        if partial and (response.status_code != 206 or self.content_encoded(response)):
+                            # The partial file no longer matches (416), the whole body was sent,
+                            # or the range is of an encoded body the partial bytes cannot precede
+                            self.store.drop_partial(partial)
+                            partial = None
+                        response.raise_for_status()
+                        if response.status_code == 206 and not partial:
+                            raise requests.exceptions.HTTPError(f'Unusable partial response for {url}', response=response)
+                        
+                        content_type = response.headers.get('content-type', '')
+                        if accept and not content_type.startswith(accept):
+                            self.logger.warning(f'Skipping unexpected content: {url} (type: {content_type})')
+                            return None
+                        
+                        if partial:
+                            self.logger.info(f'Resuming download at byte {offset}: {url}')
+                        else:
+                            offset = 0
+                            validator = self.resume_downloads and self.resume_validator(response)
+                        claimed, partial = partial, None
+                        record = self.store.put_stream(
+                            url, self.downloader.iter_body(response, offset), content_type, validator, claimed
+                        )
+                        self.http_cache.update(url, response.headers)
+                        self.metrics.record_asset(content_type, record['size'] - offset)
+            except (DownloadLimitError, requests.exceptions.ContentDecodingError):
+                # Neither would go better on a resume
+                self.store.discard_partial(url)
+                raise
+            finally:
+                if partial:
+                    # Not continued (request failed, unexpected content): keep it for a later resume
+                    self.store.keep_partial(url, partial, validator)
+            self.fetched_urls.add(url)
+        
+        if accept and not record['content_type'].startswith(accept):
+            self.logger.warning(f'Skipping unexpected content: {url} (type: {record["content_type"]})')
+            return None
+        return record
+
+    @staticmethod
+    def content_encoded(response):
+        return response.headers.get('Content-Encoding', 'identity').lower() not in ('', 'identity')
+
+    @staticmethod
+    def resume_validator(response):
+        """Return a validator usable in If-Range (a strong ETag or Last-Modified), or None
+
+        Bodies with a Content-Encoding are not resumable: they are stored
+        decoded, while a Range request counts bytes of the encoded body.
+        """
+        if WebScraper.content_encoded(response):
+            return None
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return response.headers.get('Last-Modified')
+
+    def read_asset_text(self, record):
+        """Decode a stored asset the way requests would decode the response"""
+        encoding = requests.utils.get_encoding_from_headers({'content-type': record['content_type']})
+        decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+        parts = [decoder.decode(chunk) for chunk in self.store.iter_chunks(record['digest'])]
+        parts.append(decoder.decode(b'', final=True))
+        return ''.join(parts)
+
+    def download_image(self, item):
+        """Download a single image, returning its image_info record or None"""
+        index, img_url = item
         try:
-            # Download images
-            images = self.download_images()
+            record = self.fetch_asset(img_url, accept='image/')
+            if not record:
+                return None
             
-            # Extract text content
-            self.driver.get(self.base_url)
-            self.wait_for_page_load()
-            self.scroll_page()
+            filename = self.sanitize_filename(os.path.basename(urlparse(img_url).path))
+            if not filename or filename == '.':
+                filename = f'image_{index}{os.path.splitext(filename)[1] or ".jpg"}'
+            filename = self.store.materialize(record['digest'], self.images_dir, filename)
+            self.resources.add(img_url, f'images/{filename}')
+            
+            image_info = {
+                'filename': filename,
+                'original_url': img_url,
+                'content_type': record['content_type'],
+                'size': record['size'],
+                'sha256': record['digest']
+            }
             
-            # Wait for dynamic content
-            time.sleep(2)
+            self.logger.info(f'Saved: {filename}')
+            return image_info
             
-            # Get page source after JavaScript execution
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f'Failed to download {img_url}: {str(e)}')
+        except Exception as e:
+            self.logger.error(f'Unexpected error downloading {img_url}: {str(e)}')
+        return None
+
+    def scrape(self):
+        """Extract all data from the website"""
+        try:
+            # Load the page once for every stage
+            snapshot = self.take_snapshot(self.base_url)
+            
+            # Download images
+            with self.metrics.span('download'):
+                images = self.download_images(snapshot)
             
             # Extract text content
-            text_content = self.extract_text_content(soup)
+            with self.metrics.span('extract'):
+                text_content = self.extract_text_content(snapshot.soup, snapshot.url)
             
             data = {
                 'headers': text_content['headers'],
@@ -212,8 +628,12 @@ class WebScraper:
             }
             
             # Save data
-            self.save_metadata(data)
-            self.save_text_content(data)
+            with self.metrics.span('write'):
+                self.open_records().write_page(snapshot.url, data)
+                self.save_text_content(data)
+                self.http_cache.save()
+            self.close_records()
+            self.save_stats()
             
             return data
             
@@ -222,71 +642,48 @@ class WebScraper:
             return None
 
     def wait_for_page_load(self):
-        """Wait for the page to load completely"""
+        """Wait until the page has loaded and its DOM and network are quiet"""
+        settings = config.DEFAULT_CONFIG
+        start = time.monotonic()
         try:
             self.wait.until(lambda driver: driver.execute_script('return document.readyState') == 'complete')
-            time.sleep(3)
+            _, stable = wait_until_stable(
+                self.driver,
+                quiet_window=settings['PAGE_QUIET_WINDOW'],
+                timeout=settings['PAGE_STABLE_TIMEOUT']
+            )
+            if not stable:
+                self.logger.warning('Page did not settle before the wait limit')
         except Exception as e:
             self.logger.warning(f"Error waiting for page load: {str(e)}")
+        
+        elapsed = time.monotonic() - start
+        self.logger.info(f'Waited {elapsed:.2f}s for page load')
+        return elapsed
 
     def scroll_page(self):
-        """Scroll the page to load dynamic content"""
+        """Scroll the page one viewport at a time to load dynamic content"""
+        settings = config.DEFAULT_CONFIG
+        start = time.monotonic()
         try:
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            while True:
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
+            _, steps = scroll_to_bottom(
+                self.driver,
+                quiet_window=settings['SCROLL_QUIET_WINDOW'],
+                timeout=settings['SCROLL_TIMEOUT'],
+                max_steps=settings['SCROLL_MAX_STEPS']
+            )
+            self.logger.info(f'Scrolled page in {steps} steps')
         except Exception as e:
             self.logger.warning(f"Error scrolling page: {str(e)}")
-
-    def extract_text_content(self, soup):
-        """Extract text content from the page with better handling of dynamic content"""
-        # Extract headers
-        headers = []
-        for h in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-            # Remove any script or style elements
-            for element in h.find_all(['script', 'style']):
-                element.decompose()
-            text = h.get_text(strip=True, separator=' ')
-            if text and not text.isspace():
-                headers.append(text)
-
-        # Extract paragraphs from various content containers
-        paragraphs = []
-        content_selectors = [
-            'p', 'article', 'section', '.content', '.text',
-            '[class*="content"]', '[class*="text"]', '[class*="body"]',
-            'div > p', 'main p', 'article p'
-        ]
         
-        for selector in content_selectors:
-            for element in soup.select(selector):
-                # Skip if parent is already processed
-                if any(p in paragraphs for p in element.parents):
-                    continue
-                    
-                # Remove any script, style, or nav elements
-                for unwanted in element.find_all(['script', 'style', 'nav']):
-                    unwanted.decompose()
-                    
-                text = element.get_text(strip=True, separator=' ')
-                if text and not text.isspace() and len(text) > 20:  # Minimum length to filter noise
-                    if text not in paragraphs:  # Avoid duplicates
-                        paragraphs.append(text)
+        elapsed = time.monotonic() - start
+        self.logger.info(f'Spent {elapsed:.2f}s scrolling')
+        return elapsed
 
-        # Extract links
-        links = []
-        for a in soup.find_all('a', href=True):
-            href = a.get('href')
-            if href and not href.startswith('#') and href != '/':
-                if not href.startswith(('http://', 'https://')):
-                    href = urljoin(self.base_url, href)
-                if href not in links:  # Avoid duplicates
-                    links.append(href)
+    def extract_text_content(self, soup, page_url=None):
+        """Extract headers, paragraphs and links from the page in a single tree walk"""
+        headers, paragraphs, anchors = extract_text(soup)
+        links = self.extract_links(soup, page_url, anchors=anchors)
 
         return {
             'headers': headers,
@@ -294,6 +691,23 @@ class WebScraper:
             'links': links
         }
 
+    def extract_links(self, soup, page_url=None, anchors=None):
+        """Extract absolute link URLs from the page, or from the given <a> tags"""
+        page_url = page_url or self.base_url
+        if anchors is None:
+            anchors = soup.find_all('a', href=True)
+        links = []
+        seen = set()
+        for a in anchors:
+            href = a.get('href')
+            if href and not href.startswith('#') and href != '/':
+                if not href.startswith(('http://', 'https://')):
+                    href = urljoin(page_url, href)
+                if href not in seen:  # Avoid duplicates
+                    seen.add(href)
+                    links.append(href)
+        return links
+
     @staticmethod
     def sanitize_filename(name):
         # Get file extension if exists
@@ -306,107 +720,170 @@ class WebScraper:
         return (name + ext).strip()
 
     def get_image_urls(self, soup):
+        """Find image URLs on the rendered page with one injected script"""
         image_urls = set()
         
         try:
-            # Wait for images to load
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "img")))
-            
-            # 1. Find all image elements
-            selectors = [
-                'img[src]', 'img[data-src]', 'img[data-original]',
-                'div[style*="background-image"]', 'div[data-bg]',
-                'picture source[srcset]'
-            ]
-            
-            for selector in selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for element in elements:
-                    # Check multiple attributes
-                    for attr in ['src', 'data-src', 'data-original', 'srcset', 'data-bg']:
-                        value = element.get_attribute(attr)
-                        if value:
-                            if ',' in value:  # Handle srcset
-                                urls = value.split(',')
-                                for url in urls:
-                                    image_url = url.strip().split(' ')[0]
-                                    image_urls.add(image_url)
-                            else:
-                                image_urls.add(value)
-                    
-                    # Check background image
-                    style = element.get_attribute('style')
-                    if style and 'background-image' in style:
-                        urls = re.findall(r'url\(["\']?(.*?)["\']?\)', style)
-                        image_urls.update(urls)
-
-            # 2. Execute JavaScript to find hidden images
-            js_images = self.driver.execute_script("""
-                var images = [];
-                var elements = document.getElementsByTagName('*');
-                for (var i = 0; i < elements.length; i++) {
-                    var style = window.getComputedStyle(elements[i], null);
-                    var bg = style.backgroundImage;
-                    if (bg && bg !== 'none') images.push(bg);
-                }
-                return images;
-            """)
-            
-            for img in js_images:
-                urls = re.findall(r'url\(["\']?(.*?)["\']?\)', img)
-                image_urls.update(urls)
-
+            image_urls.update(self.driver.execute_script(IMAGE_DISCOVERY_SCRIPT))
         except Exception as e:
             self.logger.error(f"Error extracting images: {str(e)}")
 
         return image_urls
 
+    def get_static_image_urls(self, soup):
+        """Find image URLs in static HTML without a browser"""
+        image_urls = set()
+        selectors = [
+            'img[src]', 'img[data-src]', 'img[data-original]',
+            'div[style*="background-image"]', 'div[data-bg]',
+            'picture source[srcset]'
+        ]
+        
+        for element in soup.select(', '.join(selectors)):
+            # Check multiple attributes
+            for attr in ['src', 'data-src', 'data-original', 'srcset', 'data-bg']:
+                value = element.get(attr)
+                if value:
+                    if attr == 'srcset':
+                        image_urls.update(url for url, _ in parse_srcset(value))
+                    else:
+                        image_urls.add(value)
+            
+            # Check background image
+            style = element.get('style')
+            if style and 'background-image' in style:
+                image_urls.update(re.findall(r'url\(["\']?(.*?)["\']?\)', style))
+        
+        return image_urls
+
     def process_css(self, css_url):
         """Process and download CSS files"""
+        css_files = self.process_stylesheets([css_url])
+        return css_files[0] if css_files else None
+
+    def process_stylesheets(self, css_urls):
+        """Process CSS files with their @imports, downloading every referenced asset together"""
+        css_urls = list(dict.fromkeys(
+            url if url.startswith(('http://', 'https://')) else urljoin(self.base_url, url)
+            for url in css_urls
+        ))
+        sheets = self.fetch_stylesheets(css_urls)
+        assets = self.download_css_assets(sheets)
+        
+        css_files = []
+        for css_url in css_urls:
+            if css_url not in sheets:
+                continue
+            try:
+                css_content = self.render_stylesheet(css_url, sheets, assets)
+                
+                # Save CSS file
+                css_filename = self.sanitize_filename(os.path.basename(urlparse(css_url).path))
+                if not css_filename.endswith('.css'):
+                    css_filename += '.css'
+                
+                rewritten = self.store.put_bytes(None, css_content.encode('utf-8'), 'text/css')
+                css_filename = self.store.materialize(rewritten['digest'], self.css_dir, css_filename)
+                self.resources.add(css_url, f'css/{css_filename}')
+                
+                self.logger.info(f'Saved CSS file: {css_filename}')
+                css_files.append(css_filename)
+                
+            except Exception as e:
+                self.logger.error(f'Error processing CSS {css_url}: {str(e)}')
+        
+        return css_files
+
+    def fetch_stylesheet(self, css_url):
+        """Fetch a stylesheet and scan it for references, returning (content, references)"""
         try:
-            if not css_url.startswith(('http://', 'https://')):
-                css_url = urljoin(self.base_url, css_url)
-            
-            response = self.session.get(css_url)
-            response.raise_for_status()
-            css_content = response.text
-            
-            # Update image paths in CSS
-            css_content = self.update_css_paths(css_content, css_url)
-            
-            # Save CSS file
-            css_filename = self.sanitize_filename(os.path.basename(urlparse(css_url).path))
-            if not css_filename.endswith('.css'):
-                css_filename += '.css'
-            
-            css_path = os.path.join(self.css_dir, css_filename)
-            with open(css_path, 'w', encoding='utf-8') as f:
-                f.write(css_content)
-            
-            self.logger.info(f'Saved CSS file: {css_filename}')
-            return css_filename
-            
+            record = self.fetch_asset(css_url)
+            css_content = self.read_asset_text(record)
+            return css_content, scan_css(css_content)
         except Exception as e:
             self.logger.error(f'Error processing CSS {css_url}: {str(e)}')
             return None
 
-    def update_css_paths(self, css_content, css_url):
-        """Update image paths in CSS"""
-        urls = re.findall(r'url\(["\']?(.*?)["\']?\)', css_content)
-        for url in urls:
-            if url.startswith('data:'):
-                continue
-                
-            absolute_url = urljoin(css_url, url)
-            filename = self.sanitize_filename(os.path.basename(urlparse(absolute_url).path))
+    def fetch_stylesheets(self, css_urls, sheets=None):
+        """Fetch stylesheets and, level by level, every stylesheet they @import"""
+        sheets = dict(sheets or {})
+        attempted = set(sheets)
+        pending = list(css_urls)
+        fetched = list(sheets)
+        while pending or fetched:
+            # Imports of the sheets fetched so far form the next level
+            for css_url in fetched:
+                for reference in sheets[css_url][1]:
+                    if reference.kind == 'import':
+                        pending.append(urldefrag(urljoin(css_url, reference.url))[0])
+            pending = [url for url in dict.fromkeys(pending) if url not in attempted]
+            attempted.update(pending)
             
-            # Download image
-            if any(absolute_url.lower().endswith(ext) for ext in ['.png', '.jpg', '.jpeg', '.gif', '.svg']):
-                img_path = os.path.join(self.images_dir, filename)
-                self.download_file(absolute_url, img_path)
-                css_content = css_content.replace(url, f'../images/{filename}')
+            fetched = []
+            for css_url, result in zip(pending, self.downloader.map(self.fetch_stylesheet, pending)):
+                if result is not None:
+                    sheets[css_url] = result
+                    fetched.append(css_url)
+            pending = []
+        return sheets
+
+    def download_css_assets(self, sheets):
+        """Download every asset referenced from the stylesheets in one batch
+
+        Returns a mapping of absolute URL to path relative to the css directory.
+        """
+        urls = []
+        for css_url, (_, references) in sheets.items():
+            for reference in references:
+                if reference.kind == 'import' or reference.url.startswith(('data:', '#')):
+                    continue
+                asset_url = urldefrag(urljoin(css_url, reference.url))[0]
+                if asset_url.startswith(('http://', 'https://')):
+                    urls.append(asset_url)
+        urls = list(dict.fromkeys(urls))
         
-        return css_content
+        local_paths = self.downloader.map(self.download_css_asset, urls)
+        return {url: local_path for url, local_path in zip(urls, local_paths) if local_path}
+
+    def download_css_asset(self, url):
+        """Download an image or font referenced from CSS, returning its path relative to the css directory"""
+        path = urlparse(url).path
+        directory = self.fonts_dir if os.path.splitext(path)[1].lower() in FONT_EXTENSIONS else self.images_dir
+        filename = self.sanitize_filename(os.path.basename(path))
+        local_path = self.download_file(url, os.path.join(directory, filename))
+        if not local_path:
+            return None
+        self.resources.add(url, os.path.relpath(local_path, self.base_dir))
+        return os.path.relpath(local_path, self.css_dir).replace(os.sep, '/')
+
+    def render_stylesheet(self, css_url, sheets, assets, chain=()):
+        """Rewrite a stylesheet's references in one pass, inlining its @imports"""
+        css_content, references = sheets[css_url]
+        chain = chain + (css_url,)
+        replacements = []
+        for reference in references:
+            target, fragment = urldefrag(urljoin(css_url, reference.url))
+            if reference.kind == 'import':
+                if target in chain:
+                    self.logger.warning(f'Skipping circular @import of {target} in {css_url}')
+                    replacements.append((reference, ''))
+                elif target in sheets:
+                    imported = self.render_stylesheet(target, sheets, assets, chain)
+                    replacements.append((reference, wrap_import(imported, reference.conditions)))
+                else:
+                    # An @import left after inlined rules would be ignored anyway
+                    self.logger.warning(f'Dropping @import of {target} in {css_url}: stylesheet not fetched')
+                    replacements.append((reference, ''))
+            elif target in assets and not reference.url.startswith(('data:', '#')):
+                local_path = assets[target] + (f'#{fragment}' if fragment else '')
+                replacements.append((reference, format_reference(reference, local_path)))
+        return rewrite_css(css_content, replacements)
+
+    def update_css_paths(self, css_content, css_url):
+        """Update asset paths in CSS and inline its @imports"""
+        sheets = self.fetch_stylesheets([], {css_url: (css_content, scan_css(css_content))})
+        assets = self.download_css_assets(sheets)
+        return self.render_stylesheet(css_url, sheets, assets)
 
     def process_javascript(self, js_url):
         """Process and download JavaScript files"""
@@ -414,16 +891,14 @@ class WebScraper:
             if not js_url.startswith(('http://', 'https://')):
                 js_url = urljoin(self.base_url, js_url)
             
-            response = self.session.get(js_url)
-            response.raise_for_status()
+            record = self.fetch_asset(js_url)
             
             js_filename = self.sanitize_filename(os.path.basename(urlparse(js_url).path))
             if not js_filename.endswith('.js'):
                 js_filename += '.js'
             
-            js_path = os.path.join(self.js_dir, js_filename)
-            with open(js_path, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+            js_filename = self.store.materialize(record['digest'], self.js_dir, js_filename)
+            self.resources.add(js_url, f'js/{js_filename}')
             
             self.logger.info(f'Saved JavaScript file: {js_filename}')
             return js_filename
@@ -433,120 +908,191 @@ class WebScraper:
             return None
 
     def download_file(self, url, local_path):
-        """Download a file and save it locally"""
+        """Download a file and save it locally, returning the path actually used"""
         try:
-            response = self.session.get(url, stream=True)
-            response.raise_for_status()
+            record = self.fetch_asset(url)
+            directory, filename = os.path.split(local_path)
+            filename = self.store.materialize(record['digest'], directory, filename)
+            local_path = os.path.join(directory, filename)
             
-            with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            
-            self.logger.info(f'Downloaded: {os.path.basename(local_path)}')
-            return True
+            self.logger.info(f'Downloaded: {filename}')
+            return local_path
             
         except Exception as e:
             self.logger.error(f'Error downloading {url}: {str(e)}')
             return False
 
-    def combine_css_files(self, css_files):
+    def combine_css_files(self, css_files, output_dir=None, name='styles.css'):
         """Combine all CSS files into one file"""
+        output_dir = output_dir or self.base_dir
         combined_css = []
         for css_file in css_files:
             file_path = os.path.join(self.css_dir, css_file)
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-                combined_css.append(f'/* {css_file} */\n{content}\n')
+            # Asset paths are relative to the css directory, not the page
+            content = rebase_css_urls(content, self.css_dir, output_dir)
+            combined_css.append(content if self.pipeline else f'/* {css_file} */\n{content}\n')
         
         # Save combined CSS
-        combined_file = os.path.join(self.base_dir, 'styles.css')
+        combined_file = os.path.join(output_dir, name)
         with open(combined_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(combined_css))
+            f.write(self.pipeline.build_css(combined_css) if self.pipeline else '\n'.join(combined_css))
         
-        self.logger.info('Combined all CSS files into styles.css')
-        return 'styles.css'
+        self.logger.info(f'Combined all CSS files into {name}')
+        return name
 
-    def combine_js_files(self, js_files):
+    def combine_js_files(self, js_files, output_dir=None, name='script.js'):
         """Combine all JavaScript files into one file"""
-        combined_js = []
-        for js_file in js_files:
-            file_path = os.path.join(self.js_dir, js_file)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                combined_js.append(f'// {js_file}\n{content}\n')
+        # Bundles are copied through in chunks rather than read whole
+        combined_file = os.path.join(output_dir or self.base_dir, name)
+        if self.pipeline:
+            bundle = self.pipeline.build_js([os.path.join(self.js_dir, js_file) for js_file in js_files])
+            with open(combined_file, 'w', encoding='utf-8') as f:
+                f.write(bundle)
+            self.logger.info(f'Combined and minified all JavaScript files into {name}')
+            return name
         
-        # Save combined JavaScript
-        combined_file = os.path.join(self.base_dir, 'script.js')
-        with open(combined_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(combined_js))
+        with open(combined_file, 'wb') as combined:
+            for index, js_file in enumerate(js_files):
+                if index:
+                    combined.write(b'\n')
+                combined.write(f'// {js_file}\n'.encode('utf-8'))
+                with open(os.path.join(self.js_dir, js_file), 'rb') as f:
+                    shutil.copyfileobj(f, combined)
+                combined.write(b'\n')
         
-        self.logger.info('Combined all JavaScript files into script.js')
-        return 'script.js'
+        self.logger.info(f'Combined all JavaScript files into {name}')
+        return name
 
-    def clone_website(self):
-        """Clone the entire website with all files"""
+    def rewrite_images(self, soup, page_url, page_dir, images):
+        """Point <img> tags at optimized local copies, with srcset variants and <picture> sources"""
+        by_url = {normalize_url(image['original_url']): image for image in images if image.get('variants')}
+        
+        def local_path(variant):
+            return quote(os.path.relpath(os.path.join(self.images_dir, variant['filename']), page_dir).replace(os.sep, '/'))
+        
+        def srcset(variants):
+            return ', '.join(f'{local_path(variant)} {variant["width"]}w' for variant in variants)
+        
+        for img in soup.find_all('img', src=True):
+            image = by_url.get(normalize_url(urljoin(page_url, img['src'])))
+            if not image:
+                continue
+            by_type = {}
+            for variant in image['variants']:
+                by_type.setdefault(variant['content_type'], []).append(variant)
+            
+            # Variants of the source format come first, smallest width first
+            own = by_type.pop(image['variants'][0]['content_type'])
+            img['src'] = local_path(own[-1])
+            img['srcset'] = srcset(own)
+            
+            if by_type and img.parent.name != 'picture':
+                img.wrap(soup.new_tag('picture'))
+                # AVIF is the smallest, so browsers that support it should pick it first
+                for content_type in sorted(by_type, key=lambda content_type: content_type != 'image/avif'):
+                    source = soup.new_tag('source', type=content_type, srcset=srcset(by_type[content_type]))
+                    if img.get('sizes'):
+                        source['sizes'] = img['sizes']
+                    img.insert_before(source)
+
+    def clone_website(self, url=None):
+        """Clone a page of the website with all files"""
+        url = url or self.base_url
         try:
-            self.logger.info(f'Starting website clone: {self.base_url}')
+            self.logger.info(f'Starting website clone: {url}')
             
             # Load page
-            self.driver.get(self.base_url)
-            self.wait_for_page_load()
-            self.scroll_page()
-            
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            
-            # Process CSS files
-            css_files = []
-            for link in soup.find_all('link', rel='stylesheet'):
-                css_url = link.get('href')
-                if css_url:
-                    css_filename = self.process_css(css_url)
-                    if css_filename:
-                        css_files.append(css_filename)
-            
-            # Process JavaScript files
-            js_files = []
-            for script in soup.find_all('script', src=True):
-                js_url = script['src']
-                js_filename = self.process_javascript(js_url)
-                if js_filename:
-                    js_files.append(js_filename)
-            
-            # Process images
-            images = self.download_images()
-            for img in soup.find_all('img'):
-                src = img.get('src')
-                if src in images:
-                    img['src'] = f'images/{os.path.basename(images[src])}'
-            
-            # Combine CSS files
-            combined_css = self.combine_css_files(css_files)
-            
-            # Combine JavaScript files
-            combined_js = self.combine_js_files(js_files)
-            
-            # Update HTML to use combined files
-            for link in soup.find_all('link', rel='stylesheet'):
-                link.decompose()
-            css_link = soup.new_tag('link', rel='stylesheet', href=combined_css)
-            soup.head.append(css_link)
-            
-            for script in soup.find_all('script', src=True):
-                script.decompose()
-            js_script = soup.new_tag('script', src=combined_js)
-            soup.body.append(js_script)
-            
-            # Save final HTML
-            html_path = os.path.join(self.base_dir, 'index.html')
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(str(soup.prettify()))
-            
-            self.logger.info('Website cloned successfully!')
+            snapshot = self.take_snapshot(url)
+            soup = snapshot.soup
+            page_url = snapshot.url  # After redirects, the base for relative references
+            
+            with self.metrics.span('extract'):
+                text_content = self.extract_text_content(soup, page_url)
+                links = text_content['links']
+            
+            with self.metrics.span('download'):
+                # Process CSS files
+                css_files = self.process_stylesheets(snapshot.stylesheet_urls)
+                
+                # Process JavaScript files
+                js_files = [f for f in self.downloader.map(self.process_javascript, snapshot.script_urls) if f]
+                
+                # Process images
+                images = self.download_images(snapshot)
+            if self.image_optimizer:
+                with self.metrics.span('optimize'):
+                    images = self.image_optimizer.optimize(images, self.images_dir)
+            
+            # Pages keep their relative path under the site directory
+            html_path = os.path.join(self.base_dir, url_to_path(url))
+            page_dir = os.path.dirname(html_path)
+            os.makedirs(page_dir, exist_ok=True)
+            
+            with self.metrics.span('write'):
+                # Serve optimized images with srcset variants
+                if self.image_optimizer:
+                    self.rewrite_images(soup, page_url, page_dir, images)
+                
+                # Point every other fetched asset at its local copy
+                rewritten = self.resources.rewrite(soup, page_url, os.path.relpath(page_dir, self.base_dir).replace(os.sep, '/'))
+                self.logger.info(f'Rewrote {rewritten} asset references to local copies')
+                
+                # Bundles are named after the page, since pages in one directory
+                # (a.html, b.html, query variants) must not share them
+                page_stem = os.path.splitext(os.path.basename(html_path))[0]
+                
+                # Combine CSS files
+                combined_css = self.combine_css_files(css_files, page_dir, f'{page_stem}.styles.css')
+                
+                # Combine JavaScript files
+                combined_js = self.combine_js_files(js_files, page_dir, f'{page_stem}.script.js')
+                
+                # Update HTML to use combined files
+                for link in soup.find_all('link', rel='stylesheet'):
+                    link.decompose()
+                css_link = soup.new_tag('link', rel='stylesheet', href=combined_css)
+                document_head(soup).append(css_link)
+                
+                for script in soup.find_all('script', src=True):
+                    script.decompose()
+                js_script = soup.new_tag('script', src=combined_js)
+                document_body(soup).append(js_script)
+                
+                # Save final HTML
+                write_html(soup, html_path)
+                
+                # Precompressed siblings for serving the clone directly
+                if self.pipeline:
+                    self.pipeline.compress([
+                        html_path,
+                        os.path.join(page_dir, combined_css),
+                        os.path.join(page_dir, combined_js)
+                    ])
+                
+                # Stream this page's records out instead of holding them for the whole run
+                self.open_records().write_page(url, dict(text_content, images=images))
+                
+                if not self.crawling:
+                    self.http_cache.save()
+            
+            self.logger.info(f'HTTP cache: {self.http_cache.saved} fetches saved '
+                             f'({self.http_cache.stats["not_modified"]} not modified, '
+                             f'{self.http_cache.stats["fresh"]} still fresh)')
+            self.save_stats()
+            
+            self.logger.info(f'Page cloned successfully: {url}')
             return {
                 'images': images,
+                'css_files': css_files,
+                'js_files': js_files,
                 'css_file': combined_css,
-                'js_file': combined_js
+                'js_file': combined_js,
+                'fetches_saved': self.http_cache.saved,
+                'html_file': os.path.relpath(html_path, self.base_dir),
+                'final_url': page_url,
+                'links': links
             }
             
         except Exception as e:
@@ -0,0 +1,26 @@
+from urllib.parse import urljoin
+
+
+class PageSnapshot:
+    """A page loaded once and shared by every extraction stage
+
+    Holds the page source, its parsed soup and the image URLs found while
+    the page was loaded (element attributes and, for rendered pages,
+    computed background images), so nothing needs to load the page again.
+    timings records the seconds spent waiting for and scrolling the page.
+    """
+
+    def __init__(self, url, html, soup, image_urls, rendered=False, timings=None):
+        self.url = url
+        self.html = html
+        self.soup = soup
+        self.image_urls = image_urls
+        self.rendered = rendered
+        self.timings = timings or {}
+
+        # Asset discovery happens before any stage modifies the soup
+        self.stylesheet_urls = [
+            urljoin(url, link.get('href'))
+            for link in soup.find_all('link', rel='stylesheet') if link.get('href')
+        ]
+        self.script_urls = [urljoin(url, script['src']) for script in soup.find_all('script', src=True)]
@@ -0,0 +1,224 @@
+HEADER_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# Stripped from headers, and from paragraph containers along with nav
+STRIPPED_TAGS = {'script', 'style'}
+REMOVED_TAGS = {'script', 'style', 'nav'}
+
+# Paragraph containers, in priority order. 'div > p', 'main p' and
+# 'article p' only ever match elements already matched by 'p'.
+CONTENT_SELECTORS = [
+    'p', 'article', 'section', '.content', '.text',
+    '[class*="content"]', '[class*="text"]', '[class*="body"]',
+    'div > p', 'main p', 'article p'
+]
+
+MIN_PARAGRAPH_LENGTH = 20  # Minimum length to filter noise
+
+
+class _Node:
+    __slots__ = ('tag', 'depth', 'start', 'end', 'priority', 'parent', 'removed',
+                 'removed_parent', 'in_header', 'processed', 'claimed')
+
+    def __init__(self, tag, depth, start, parent, removed):
+        self.tag = tag
+        self.depth = depth
+        self.start = start
+        self.end = start
+        self.priority = None
+        self.parent = parent  # Nearest enclosing paragraph container
+        self.removed = removed  # Nearest enclosing-or-self script/style/nav
+        self.removed_parent = None
+        self.in_header = False
+        self.processed = False
+        self.claimed = False
+
+
+def selector_priority(tag):
+    """Return the index of the first CONTENT_SELECTORS entry matching tag, or None"""
+    name = tag.name
+    if name == 'p':
+        return 0
+    if name == 'article':
+        return 1
+    if name == 'section':
+        return 2
+    classes = tag.get('class')
+    if not classes:
+        return None
+    if isinstance(classes, str):
+        classes = classes.split()
+    joined = ' '.join(classes)
+    if 'content' in classes:
+        return 3
+    if 'text' in classes:
+        return 4
+    if 'content' in joined:
+        return 5
+    if 'text' in joined:
+        return 6
+    if 'body' in joined:
+        return 7
+    return None
+
+
+def _string_types(tag):
+    from bs4.element import Tag
+    types = tag.interesting_string_types
+    if types is None:
+        return Tag.MAIN_CONTENT_STRING_TYPES
+    if isinstance(types, type):
+        return (types,)
+    return types
+
+
+def _walk(soup):
+    """Walk the tree once, recording strings and the elements that matter
+
+    Every non-empty stripped string is recorded with the depth of its
+    deepest script/style and script/style/nav ancestor, and every element
+    records the range of strings it contains, so an element's text can be
+    built without traversing its subtree again.
+    """
+    # bs4 is imported on first use, after the first request has gone out
+    from bs4.element import NavigableString, Tag
+
+    strings = []
+    headers = []
+    containers = []
+    anchors = []
+
+    stripped = []  # Depths of open script/style elements
+    removed = []  # Open script/style/nav nodes
+    header_depth = 0  # Number of open header elements
+    stack = [(iter(soup.contents), None, 0, None)]
+
+    while stack:
+        children, node, depth, container = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if node is not None:
+                node.end = len(strings)
+                name = node.tag.name
+                if name in REMOVED_TAGS:
+                    removed.pop()
+                    if name in STRIPPED_TAGS:
+                        stripped.pop()
+                if name in HEADER_TAGS:
+                    header_depth -= 1
+            continue
+
+        if isinstance(child, NavigableString):
+            text = child.strip()
+            if text:
+                strings.append((
+                    text,
+                    type(child),
+                    stripped[-1] if stripped else -1,
+                    removed[-1].depth if removed else -1
+                ))
+            continue
+        if not isinstance(child, Tag):
+            continue
+
+        child_depth = depth + 1
+        child_node = _Node(child, child_depth, len(strings), container, removed[-1] if removed else None)
+        name = child.name
+        if name in REMOVED_TAGS:
+            child_node.removed_parent = child_node.removed
+            child_node.removed = child_node
+            removed.append(child_node)
+            if name in STRIPPED_TAGS:
+                stripped.append(child_depth)
+                child_node.in_header = header_depth > 0
+        if name in HEADER_TAGS:
+            headers.append(child_node)
+            header_depth += 1
+        elif name == 'a' and child.get('href') is not None:
+            anchors.append(child_node)
+
+        child_node.priority = selector_priority(child)
+        if child_node.priority is not None:
+            containers.append(child_node)
+            container = child_node
+        stack.append((iter(child.contents), child_node, child_depth, container))
+
+    return strings, headers, containers, anchors
+
+
+def _is_removed(node):
+    """Check whether a processed container already removed this element
+
+    Processing a container strips the script/style/nav elements inside it
+    from the document, along with everything they contain.
+    """
+    if node.removed is not None and node.removed.tag.name in STRIPPED_TAGS and node.removed.in_header:
+        return True  # Stripped from a header before paragraphs were extracted
+    removed = node.removed
+    while removed is not None:
+        container = removed.parent
+        while container is not None:
+            if container.processed:
+                return True
+            container = container.parent
+        removed = removed.removed_parent
+    return False
+
+
+def _has_claimed_ancestor(node):
+    container = node.parent
+    while container is not None:
+        if container.claimed:
+            return True
+        container = container.parent
+    return False
+
+
+def extract_text(soup):
+    """Extract headers, paragraphs and link anchors in a single tree walk
+
+    Paragraphs come out in CONTENT_SELECTORS order, and in document order
+    within each selector. A container whose ancestor was already taken as a
+    paragraph is skipped, and duplicate texts are dropped. The soup is not
+    modified.
+
+    Returns (headers, paragraphs, anchors) where anchors are the <a href>
+    tags still present once script/style/nav elements inside paragraph
+    containers are discounted.
+    """
+    strings, header_nodes, containers, anchor_nodes = _walk(soup)
+
+    headers = []
+    for node in header_nodes:
+        types = _string_types(node.tag)
+        text = ' '.join(
+            text for text, string_type, stripped_depth, _ in strings[node.start:node.end]
+            if stripped_depth <= node.depth and string_type in types
+        )
+        if text:
+            headers.append(text)
+
+    priorities = {}
+    for node in containers:
+        priorities.setdefault(node.priority, []).append(node)
+
+    paragraphs = []
+    seen = set()
+    for priority in sorted(priorities):
+        for node in priorities[priority]:
+            if _has_claimed_ancestor(node) or _is_removed(node):
+                continue
+            node.processed = True
+
+            types = _string_types(node.tag)
+            text = ' '.join(
+                text for text, string_type, _, removed_depth in strings[node.start:node.end]
+                if removed_depth <= node.depth and string_type in types
+            )
+            if len(text) > MIN_PARAGRAPH_LENGTH and text not in seen:
+                seen.add(text)
+                paragraphs.append(text)
+                node.claimed = True
+
+    anchors = [node.tag for node in anchor_nodes if not _is_removed(node)]
+    return headers, paragraphs, anchors
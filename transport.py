@@ -0,0 +1,159 @@
+import logging
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+TRANSPORTS = ('requests', 'http2')
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+logger = logging.getLogger(__name__)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests made without one"""
+
+    def __init__(self, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def build_retry(retries, backoff):
+    """Retry connection errors and RETRY_STATUSES with exponential backoff
+
+    The first retry is immediate, the n-th waits backoff * 2**(n-1) seconds
+    (or the server's Retry-After). Once retries run out the last response
+    is returned as-is so raise_for_status() reports it.
+    """
+    return Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+
+class Http2Response:
+    """requests-style view of a streamed httpx response"""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+
+    def read(self):
+        import httpx
+        try:
+            self._response.read()
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+
+    @property
+    def content(self):
+        self.read()
+        return self._response.content
+
+    @property
+    def text(self):
+        self.read()
+        return self._response.text
+
+    def iter_content(self, chunk_size=None):
+        import httpx
+        try:
+            yield from self._response.iter_bytes(chunk_size)
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f'{self.status_code} Error for url: {self.url}', response=self)
+
+    def close(self):
+        self._response.close()
+
+
+class Http2Session:
+    """Minimal requests.Session stand-in backed by an HTTP/2 httpx client
+
+    Requests to the same host are multiplexed over one connection. Only
+    get() is provided, which is all DownloadEngine uses. Raises ImportError
+    if httpx or its http2 extra is not installed.
+    """
+
+    def __init__(self, pool_size=10, retries=3, backoff=1.5, timeout=(5, 30), pool_hosts=32):
+        import httpx
+        connect, read = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = httpx.Timeout(read, connect=connect)
+        self.client = httpx.Client(
+            http2=True,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=pool_hosts * pool_size),
+            follow_redirects=True
+        )
+        self.headers = self.client.headers
+
+    def get(self, url, timeout=None, stream=False, headers=None):
+        import httpx
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        request = self.client.build_request('GET', url, headers=headers, timeout=timeout or self.timeout)
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.client.send(request, stream=True)
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise requests.exceptions.ConnectionError(str(e))
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    if not stream:
+                        response.read()
+                    return Http2Response(response)
+                response.close()
+            if attempt:
+                time.sleep(self.backoff * 2 ** attempt)  # Same schedule as build_retry
+
+    def close(self):
+        self.client.close()
+
+
+def create_session(backend='requests', pool_size=10, retries=3, backoff=1.5, timeout=(5, 30),
+                   pool_hosts=32, headers=None):
+    """Create the HTTP session every fetch goes through
+
+    Connections are kept alive in per-host pools of pool_size, requests
+    without an explicit timeout get the (connect, read) default, and
+    failures are retried with exponential backoff. backend='http2' uses
+    httpx when it is installed and falls back to requests otherwise.
+    """
+    if backend == 'http2':
+        try:
+            session = Http2Session(pool_size, retries, backoff, timeout, pool_hosts)
+            session.headers.update(headers or {})
+            return session
+        except ImportError:
+            logger.warning('HTTP/2 transport needs httpx[http2]; falling back to requests')
+
+    session = requests.Session()
+    adapter = TimeoutHTTPAdapter(
+        timeout=timeout,
+        pool_connections=pool_hosts,
+        pool_maxsize=pool_size,
+        max_retries=build_retry(retries, backoff)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(headers or {})
+    return session
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import posixpath
+import re
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode, unquote
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Links with these extensions are assets, not pages
+NON_PAGE_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico', '.bmp', '.avif',
+    '.css', '.js', '.json', '.xml', '.txt', '.pdf', '.zip', '.gz', '.tar', '.rar',
+    '.mp3', '.mp4', '.webm', '.mov', '.avi', '.woff', '.woff2', '.ttf', '.eot'
+}
+
+# Directory index pages, served for the directory URL itself
+INDEX_FILES = ('index.html', 'index.htm')
+
+
+def normalize_url(url):
+    """Normalize a URL so equivalent addresses compare equal
+
+    Lowercases scheme and host, drops default ports and fragments,
+    sorts query parameters and strips trailing slashes.
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parsed.port}'
+
+    path = posixpath.normpath(parsed.path) if parsed.path else '/'
+    if path == '.':
+        path = '/'
+    if path != '/':
+        path = path.rstrip('/')
+
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, host, path, '', query, ''))
+
+
+def page_key(url):
+    """Normalize a page URL for deduplication, so /docs/, /docs and /docs/index.html are one page"""
+    parsed = urlparse(normalize_url(url))
+    path = parsed.path
+    if posixpath.basename(path).lower() in INDEX_FILES:
+        path = posixpath.dirname(path)
+    return urlunparse(parsed._replace(path=path))
+
+
+def is_same_domain(url, domain):
+    """Check whether a URL belongs to the given netloc"""
+    return urlparse(url).netloc.lower() == domain.lower()
+
+
+def is_page_url(url):
+    """Check whether a URL looks like a crawlable HTML page"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https'):
+        return False
+    ext = os.path.splitext(parsed.path)[1].lower()
+    return ext not in NON_PAGE_EXTENSIONS
+
+
+def url_to_path(url):
+    """Map a page URL to a relative output path, keeping its directory layout"""
+    parsed = urlparse(page_key(url))
+    parts = [re.sub(r'[<>:"\\|?*]', '', part) for part in unquote(parsed.path).split('/')]
+    parts = [part for part in parts if part not in ('', '.', '..')]
+
+    if parts and os.path.splitext(parts[-1])[1] in ('.html', '.htm'):
+        filename = parts.pop()
+    else:
+        filename = 'index.html'
+
+    # Distinct query strings must not overwrite each other
+    if parsed.query:
+        name, ext = os.path.splitext(filename)
+        digest = hashlib.sha1(parsed.query.encode('utf-8')).hexdigest()[:8]
+        filename = f'{name}_{digest}{ext}'
+
+    return os.path.join(*parts, filename)